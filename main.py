@@ -1,10 +1,25 @@
 
-from fastapi import FastAPI, HTTPException
+import json
+import sys
+from pathlib import Path
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Optional, List, Union
 import uvicorn
 
+# Modules under src/ import each other by bare name (they also run as
+# scripts), so the API imports them the same way to share one module object.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from risk_store import RiskStore, STORE_PATH
+from drift import DriftMonitor, REFERENCE_PATH
+from model_registry import DEFAULT_MODEL_ID
+from audit import AuditLog
+from feature_store import FeatureStore, FEATURE_STORE_PATH
+from upload_stream import UploadStreamingResponse, check_upload_content_type, iter_upload_bytes, iter_record_chunks
+
 
 
 app = FastAPI(
@@ -25,6 +40,77 @@ app.add_middleware(
 )
 
 
+risk_store = RiskStore()
+drift_monitors = {}
+audit_log = AuditLog()
+feature_store = None
+
+
+@app.on_event("startup")
+def load_risk_store():
+    global risk_store
+    if STORE_PATH.exists():
+        risk_store = RiskStore.load(STORE_PATH)
+    risk_store.start_snapshots(STORE_PATH)
+
+
+@app.on_event("startup")
+def load_drift_monitor():
+    if REFERENCE_PATH.exists():
+        drift_monitors[DEFAULT_MODEL_ID] = DriftMonitor.load(REFERENCE_PATH)
+
+
+def drift_monitor_for(model_id: Optional[str]):
+    # Each model is compared against its own training reference, stored next
+    # to its artifacts, so business units never mix into each other's report.
+    model_id = model_id or DEFAULT_MODEL_ID
+    monitor = drift_monitors.get(model_id)
+    if monitor is None:
+        from predict import REGISTRY
+        reference_path = REGISTRY.path_for(model_id) / REFERENCE_PATH.name
+        if reference_path.exists():
+            monitor = drift_monitors.setdefault(model_id, DriftMonitor.load(reference_path))
+    return monitor
+
+
+@app.on_event("startup")
+def load_pinned_models():
+    from predict import REGISTRY
+    for model_id in list(REGISTRY.pinned):
+        try:
+            REGISTRY.pin(model_id)
+        except FileNotFoundError:
+            print(f"Pinned model '{model_id}' not found, skipping preload")
+
+
+@app.on_event("startup")
+def open_feature_store():
+    global feature_store
+    if FEATURE_STORE_PATH.exists():
+        feature_store = FeatureStore(FEATURE_STORE_PATH)
+
+
+@app.on_event("shutdown")
+def close_feature_store():
+    if feature_store is not None:
+        feature_store.close()
+
+
+@app.on_event("startup")
+def start_audit_log():
+    audit_log.start()
+
+
+@app.on_event("shutdown")
+def flush_audit_log():
+    audit_log.close()
+
+
+@app.on_event("shutdown")
+def save_risk_store():
+    risk_store.close(STORE_PATH)
+
+
 
 
 class EmployeeInput(BaseModel):
@@ -97,6 +183,25 @@ class EmployeeInput(BaseModel):
         }
 
 
+class ScenarioTransform(BaseModel):
+
+    field: str = Field(..., example="OverTime")
+    op: str = Field(..., pattern="^(set|add|multiply)$", example="set")
+    value: Union[int, float, str] = Field(..., example=0)
+
+
+class Scenario(BaseModel):
+
+    name: str = Field(..., example="No overtime in Sales")
+    filter: Dict[str, Union[List[Union[int, str]], int, str]] = Field(default_factory=dict, example={"Department": "Sales"})
+    transforms: List[ScenarioTransform] = Field(..., min_length=1)
+
+
+class SimulationRequest(BaseModel):
+
+    scenarios: List[Scenario] = Field(..., min_length=1, max_length=50)
+
+
 class PredictionResponse(BaseModel):
   
     will_attrite: bool
@@ -108,6 +213,19 @@ class PredictionResponse(BaseModel):
 
 
 
+MODEL_ID_QUERY = Query(None, pattern="^[A-Za-z0-9_-]+$", description="Business-unit model id; omit for the default model")
+
+
+def model_not_found(model_id: Optional[str]) -> HTTPException:
+    
+    if model_id:
+        return HTTPException(status_code=404, detail=f"Model '{model_id}' not found.")
+    return HTTPException(
+        status_code=503,
+        detail="Model not found. Please run 'python src/train.py' first."
+    )
+
+
 @app.get("/", tags=["Health"])
 def health_check():
     
@@ -120,27 +238,222 @@ def health_check():
 
 
 @app.post("/predict", response_model=PredictionResponse, tags=["Prediction"])
-def predict_attrition(employee: EmployeeInput):
+def predict_attrition(employee: EmployeeInput, model_id: Optional[str] = MODEL_ID_QUERY):
     
     try:
-        from src.predict import predict_attrition as run_prediction
+        from predict import predict_attrition as run_prediction, get_model_version
         employee_dict = employee.model_dump()
-        result = run_prediction(employee_dict)
+        result = run_prediction(employee_dict, model_id)
+        drift_monitor = drift_monitor_for(model_id)
+        if drift_monitor is not None:
+            drift_monitor.update(employee_dict, result["attrition_probability"])
+        audit_log.record(employee_dict, result["attrition_probability"], result["risk_level"],
+                         get_model_version(model_id))
         result["status"] = "success"
         return result
     except FileNotFoundError:
-        raise HTTPException(
-            status_code=503,
-            detail="Model not found. Please run 'python src/train.py' first."
-        )
+        raise model_not_found(model_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def score_stream_chunk(records: list, first_row: int, artifacts: tuple, model_version: str,
+                       drift_monitor: Optional[DriftMonitor]) -> str:
+    
+    import pandas as pd
+    from predict import score_frame
+
+    lines = [None] * len(records)
+    valid_rows, valid_records = [], []
+    for i, record in enumerate(records):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            valid_records.append(EmployeeInput.model_validate(record).model_dump())
+            valid_rows.append(i)
+        except (ValueError, ValidationError) as e:
+            lines[i] = {"row": first_row + i, "status": "error", "detail": str(e)}
+
+    if valid_records:
+        results = score_frame(pd.DataFrame(valid_records), *artifacts)
+        for i, record, result in zip(valid_rows, valid_records, results):
+            lines[i] = {"row": first_row + i, **result, "status": "success"}
+            if drift_monitor is not None:
+                drift_monitor.update(record, result["attrition_probability"])
+            audit_log.record(record, result["attrition_probability"], result["risk_level"], model_version)
+
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+@app.post("/predict/stream", tags=["Prediction"])
+async def predict_stream(request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+                         model_id: Optional[str] = MODEL_ID_QUERY):
+    
+    from predict import load_artifacts, get_model_version
+    try:
+        check_upload_content_type(request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        artifacts = await run_in_threadpool(load_artifacts, model_id)
+        model_version = get_model_version(model_id)
+    except FileNotFoundError:
+        raise model_not_found(model_id)
+    drift_monitor = drift_monitor_for(model_id)
+
+    async def results():
+        row = 0
+        async for records in iter_record_chunks(iter_upload_bytes(request), format):
+            yield await run_in_threadpool(score_stream_chunk, records, row, artifacts, model_version,
+                                           drift_monitor)
+            row += len(records)
+
+    return UploadStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/employees/{employee_id}/score", response_model=PredictionResponse, tags=["Org Risk"])
+def score_employee(employee_id: str, employee: EmployeeInput, manager_id: Optional[str] = None):
+    
+    from predict import get_model_version
+    result = predict_attrition(employee, model_id=None)
+    record = employee.model_dump()
+    record["ManagerId"] = manager_id
+    risk_store.upsert(employee_id, record, result["attrition_probability"], result["risk_level"],
+                      get_model_version())
+    return result
+
+
+def current_model_version():
+    from predict import get_model_version
+    try:
+        return get_model_version()
+    except FileNotFoundError:
+        return None
+
+
+@app.post("/org-risk/rescore", tags=["Org Risk"])
+def org_risk_rescore(force: bool = False):
+    
+    # Bulk path: runs the incremental re-scoring job and feeds every new,
+    # changed or model-stale employee into the risk store in batches.
+    from rescore import rescore, DATA_PATH
+    if not Path(DATA_PATH).exists():
+        raise HTTPException(status_code=404, detail=f"Population data '{DATA_PATH}' not found.")
+    try:
+        return rescore(DATA_PATH, force=force, risk_store=risk_store)
+    except FileNotFoundError:
+        raise model_not_found(None)
+
+
+@app.get("/employees/{employee_id}/risk", response_model=PredictionResponse, tags=["Org Risk"])
+def employee_risk(employee_id: str):
+    
+    from predict import load_artifacts, get_model_version, get_preprocessing_version, score_vectors
+
+    if feature_store is None:
+        raise HTTPException(status_code=404, detail="Feature store not found. Run 'python src/feature_store.py ingest' first.")
+    try:
+        model, preprocessor, feature_list = load_artifacts()
+        version = get_preprocessing_version()
+    except FileNotFoundError:
+        raise model_not_found(None)
+
+    found = feature_store.lookup_vector(employee_id, preprocessor, feature_list, version)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Employee '{employee_id}' not found in the feature store.")
+    raw, vector = found
+
+    # Read-only with respect to the org risk store: the stored raw record has
+    # no ManagerId, so upserting it would drop the employee's manager group.
+    result = score_vectors(vector[None, :], model)[0]
+    audit_log.record(raw, result["attrition_probability"], result["risk_level"], get_model_version())
+    result["status"] = "success"
+    return result
+
+
+@app.get("/org-risk/{group_by}", tags=["Org Risk"])
+def org_risk(group_by: str):
+    
+    if group_by not in risk_store.group_fields:
+        raise HTTPException(status_code=404, detail=f"Unknown grouping '{group_by}'. Use one of {risk_store.group_fields}.")
+    return {
+        "group_by": group_by,
+        "groups": risk_store.group_summaries(group_by),
+        "model_versions": risk_store.model_versions(current_model_version()),
+    }
+
+
+@app.get("/org-risk/{group_by}/{group}", tags=["Org Risk"])
+def org_risk_group(group_by: str, group: str, k: int = Query(10, ge=1, le=500)):
+    
+    if group_by not in risk_store.group_fields:
+        raise HTTPException(status_code=404, detail=f"Unknown grouping '{group_by}'. Use one of {risk_store.group_fields}.")
+    summary = risk_store.group_summary(group_by, group, k)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"No scored employees in {group_by} '{group}'.")
+    return {**summary, "model_versions": risk_store.model_versions(current_model_version())}
+
+
+@app.get("/models", tags=["Models"])
+def list_models():
+    
+    from predict import REGISTRY
+    return REGISTRY.stats()
+
+
+@app.post("/models/{model_id}/pin", tags=["Models"])
+def pin_model(model_id: str):
+    
+    from predict import REGISTRY
+    try:
+        REGISTRY.pin(model_id)
+    except (FileNotFoundError, ValueError):
+        raise model_not_found(model_id)
+    return {"model_id": model_id, "pinned": True}
+
+
+@app.delete("/models/{model_id}/pin", tags=["Models"])
+def unpin_model(model_id: str):
+    
+    from predict import REGISTRY
+    REGISTRY.unpin(model_id)
+    return {"model_id": model_id, "pinned": False}
+
+
+@app.get("/audit/stats", tags=["Monitoring"])
+def audit_stats():
+    
+    return audit_log.stats()
+
+
+@app.get("/drift", tags=["Monitoring"])
+def drift(window_minutes: int = Query(60, ge=5, le=24 * 60), model_id: Optional[str] = MODEL_ID_QUERY):
+    
+    drift_monitor = drift_monitor_for(model_id)
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift reference not found. Train the model first.")
+    return drift_monitor.report(window_minutes * 60)
+
+
+@app.post("/simulate", tags=["Simulation"])
+def simulate_policies(request: SimulationRequest, model_id: Optional[str] = MODEL_ID_QUERY):
+    
+    from simulation import simulate, DATA_PATH
+    if not Path(DATA_PATH).exists():
+        raise HTTPException(status_code=404, detail=f"Population data '{DATA_PATH}' not found.")
+    try:
+        # Scored in-process from the model registry: forking the threaded
+        # server (audit writer, SQLite handles) into a process pool is unsafe.
+        return simulate([s.model_dump() for s in request.scenarios], model_id=model_id, n_workers=1)
+    except FileNotFoundError:
+        raise model_not_found(model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @app.get("/model-info", tags=["Info"])
 def model_info():
     
-    import json
     from pathlib import Path
     metadata_path = Path("models/model_metadata.json")
     if not metadata_path.exists():
@@ -149,6 +462,19 @@ def model_info():
         return json.load(f)
 
 
+@app.get("/feature-importance", tags=["Info"])
+def feature_importance():
+    
+    metadata_path = Path("models/model_metadata.json")
+    if not metadata_path.exists():
+        raise HTTPException(status_code=404, detail="Model metadata not found. Train the model first.")
+    with open(metadata_path) as f:
+        importance = json.load(f).get("feature_importance")
+    if importance is None:
+        raise HTTPException(status_code=404, detail="Feature importance not computed. Run 'python src/train.py' first.")
+    return importance
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
 
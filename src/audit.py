@@ -0,0 +1,218 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+AUDIT_DB_PATH = Path(os.environ.get("ATTRITION_AUDIT_DB", "logs/audit.db"))
+BUFFER_SIZE = 100_000
+FLUSH_INTERVAL = float(os.environ.get("ATTRITION_AUDIT_FLUSH_SECONDS", 1.0))
+FLUSH_SIZE = int(os.environ.get("ATTRITION_AUDIT_FLUSH_ROWS", 1000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    model_version TEXT,
+    probability REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    input TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts);
+"""
+
+
+def connect(path: Path = AUDIT_DB_PATH) -> sqlite3.Connection:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class AuditLog:
+
+    def __init__(self, path: Path = AUDIT_DB_PATH, buffer_size: int = BUFFER_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, flush_size: int = FLUSH_SIZE):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.dropped = 0
+        self.written = 0
+        self.failures = 0
+        self.last_error = None
+        self._reported_dropped = 0
+        # Bounded ring buffer: when the writer falls behind, the oldest
+        # unwritten entries are overwritten and counted in `dropped`.
+        self._buffer = deque(maxlen=buffer_size)
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, employee: dict, probability: float, risk_level: str, model_version: str = None):
+        # Called on the request path: no serialisation or I/O here, just an
+        # append of references onto the deque.
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((time.time(), model_version, probability, risk_level, employee))
+        if len(self._buffer) >= self.flush_size:
+            self._wakeup.set()
+
+    def _drain(self) -> list:
+        batch = []
+        while self._buffer:
+            try:
+                batch.append(self._buffer.popleft())
+            except IndexError:
+                break
+        return batch
+
+    def _requeue(self, batch: list):
+        # Put an unwritten batch back at the front, oldest first. If new
+        # records have filled the buffer meanwhile, the oldest of the batch
+        # are the ones dropped.
+        overflow = max(0, len(batch) - (self._buffer.maxlen - len(self._buffer)))
+        self.dropped += overflow
+        self._buffer.extendleft(reversed(batch[overflow:]))
+
+    def _flush(self, conn: sqlite3.Connection):
+        batch = self._drain()
+        if not batch:
+            return
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO predictions (ts, model_version, probability, risk_level, input) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(ts, version, prob, risk, json.dumps(employee)) for ts, version, prob, risk, employee in batch],
+                )
+        except sqlite3.Error:
+            self._requeue(batch)
+            raise
+        self.written += len(batch)
+
+    def _report_dropped(self):
+        if self.dropped > self._reported_dropped:
+            print(f"Audit log dropped {self.dropped - self._reported_dropped} entries "
+                  f"(buffer full, {self.dropped} total)")
+            self._reported_dropped = self.dropped
+
+    def _flush_safely(self, conn):
+        # A failed flush (locked database, full disk, ...) keeps the batch
+        # buffered and is retried on the next interval with a new connection.
+        try:
+            if conn is None:
+                conn = connect(self.path)
+            self._flush(conn)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Audit log flush failed ({len(self._buffer)} entries buffered): {e}")
+            if conn is not None:
+                conn.close()
+            conn = None
+        self._report_dropped()
+        return conn
+
+    def _run(self):
+        conn = None
+        try:
+            while not self._stopping:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                conn = self._flush_safely(conn)
+            conn = self._flush_safely(conn)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "buffered": len(self._buffer),
+            "failed_flushes": self.failures,
+            "last_error": self.last_error,
+        }
+
+    def close(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+        if self._buffer:
+            print(f"Audit log closed with {len(self._buffer)} unwritten entries")
+
+
+def query(conn: sqlite3.Connection, since: float = None, until: float = None, risk_level: str = None,
+          model_version: str = None, limit: int = 100) -> list:
+
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(until)
+    if risk_level:
+        clauses.append("risk_level = ?")
+        params.append(risk_level)
+    if model_version:
+        clauses.append("model_version = ?")
+        params.append(model_version)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = conn.execute(
+        f"SELECT id, ts, model_version, probability, risk_level, input FROM predictions {where} "
+        f"ORDER BY ts DESC LIMIT ?",
+        params + [limit],
+    ).fetchall()
+
+    return [
+        {
+            "id": row[0],
+            "timestamp": datetime.fromtimestamp(row[1], tz=timezone.utc).isoformat(),
+            "model_version": row[2],
+            "attrition_probability": row[3],
+            "risk_level": row[4],
+            "input": json.loads(row[5]),
+        }
+        for row in rows
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    def timestamp(value: str) -> float:
+        dt = datetime.fromisoformat(value)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+
+    parser = argparse.ArgumentParser(description="Query the prediction audit log")
+    parser.add_argument("--db", type=Path, default=AUDIT_DB_PATH)
+    parser.add_argument("--since", type=timestamp, help="ISO timestamp, UTC if no offset")
+    parser.add_argument("--until", type=timestamp, help="ISO timestamp, UTC if no offset")
+    parser.add_argument("--risk", choices=["Low", "Medium", "High"])
+    parser.add_argument("--model-version")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    for entry in query(conn, args.since, args.until, args.risk, args.model_version, args.limit):
+        print(json.dumps(entry))
+    conn.close()
@@ -0,0 +1,64 @@
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+from joblib import parallel_config
+from joblib.externals.loky import get_reusable_executor
+from threadpoolctl import threadpool_limits
+
+
+def _cpu_seconds() -> float:
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class CpuBudget:
+
+    def __init__(self, total: int = None):
+        if total is None:
+            total = int(os.environ.get("ATTRITION_CPU_BUDGET", 0)) or os.cpu_count() or 1
+        self.total = max(int(total), 1)
+        self.log = []
+
+    def allocate(self, tasks: int, inner: int = None) -> tuple:
+        # Split the budget into `outer` concurrent tasks × `inner` threads each,
+        # never scheduling more outer workers than there are tasks to run.
+        if inner is None:
+            outer = max(1, min(tasks, self.total))
+        else:
+            outer = max(1, min(tasks, self.total // max(inner, 1)))
+        inner = max(1, self.total // outer)
+        return outer, inner
+
+    @contextmanager
+    def stage(self, name: str, outer: int, inner: int, processes: bool = False):
+        # Only stages whose outer level runs in worker processes (GridSearch,
+        # Voting, Stacking n_jobs) are pinned to loky with an inner thread cap;
+        # elsewhere estimators keep their default backend, e.g. threads for
+        # RandomForest. Any loky workers (including ones an estimator starts by
+        # default, e.g. Bagging) are shut down on exit so their CPU time is
+        # reaped into the children counters and the utilisation reflects the
+        # whole stage, not just the parent process.
+        start_wall, start_cpu = time.perf_counter(), _cpu_seconds()
+        config = (parallel_config(backend="loky", inner_max_num_threads=inner) if processes
+                  else nullcontext())
+        with config, threadpool_limits(limits=inner):
+            yield
+        get_reusable_executor().shutdown(wait=True)
+
+        wall = time.perf_counter() - start_wall
+        cpu = _cpu_seconds() - start_cpu
+        cores = outer * inner
+        utilisation = cpu / (wall * self.total) if wall > 0 else 0.0
+        self.log.append({
+            "stage": name,
+            "outer_workers": outer,
+            "inner_threads": inner,
+            "wall_seconds": round(wall, 2),
+            "cpu_seconds": round(cpu, 2),
+            "utilisation": round(utilisation, 3),
+        })
+        print(
+            f"[cpu] {name:<22} | {outer} workers × {inner} threads = {cores}/{self.total} cores | "
+            f"wall={wall:.1f}s cpu={cpu:.1f}s | utilisation={utilisation:.0%}"
+        )
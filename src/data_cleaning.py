@@ -70,7 +70,7 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def clean_data(filepath: str) -> pd.DataFrame:
+def clean_data(filepath: str, keep_ids: bool = False) -> pd.DataFrame:
     
     print("\n" + "="*50)
     print("STEP 2: DATA CLEANING")
@@ -78,13 +78,15 @@ def clean_data(filepath: str) -> pd.DataFrame:
 
     df = load_data(filepath)
     df = drop_constant_columns(df)
-    df = drop_id_columns(df)
+    if not keep_ids:
+        df = drop_id_columns(df)
     df = fix_dtypes(df)
     df = remove_duplicates(df)
     df = handle_missing_values(df)
 
     print(f"\n Cleaning complete → {df.shape[0]} rows × {df.shape[1]} columns")
-    print(f"   Target distribution:\n{df['Attrition'].value_counts().to_string()}")
+    if "Attrition" in df.columns:
+        print(f"   Target distribution:\n{df['Attrition'].value_counts().to_string()}")
     print("="*50 + "\n")
 
     return df
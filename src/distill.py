@@ -0,0 +1,159 @@
+import json
+import os
+import pickle
+import time
+import joblib
+import numpy as np
+from pathlib import Path
+
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import roc_auc_score
+
+MODELS_DIR = Path("models")
+
+# A student is only published as the serving model when all of these hold on
+# the held-out test set.
+FIDELITY_THRESHOLDS = {
+    "max_probability_mae": float(os.environ.get("ATTRITION_DISTILL_MAX_MAE", 0.04)),
+    "min_risk_agreement": float(os.environ.get("ATTRITION_DISTILL_MIN_AGREEMENT", 0.93)),
+    "max_auc_drop": float(os.environ.get("ATTRITION_DISTILL_MAX_AUC_DROP", 0.02)),
+}
+AUGMENT_FACTOR = 20
+LATENCY_REPEATS = 200
+
+
+def augment(X: np.ndarray, n_numeric: int, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+
+    # Mixup between random pairs of training rows: scaled numeric columns are
+    # interpolated, the one-hot block is copied whole from the nearer parent so
+    # every synthetic row still has exactly one active category per field.
+    a = X[rng.integers(0, len(X), n_samples)]
+    b = X[rng.integers(0, len(X), n_samples)]
+    lam = rng.uniform(0, 1, size=(n_samples, 1))
+
+    synthetic = np.where(lam >= 0.5, a, b)
+    synthetic[:, :n_numeric] = lam * a[:, :n_numeric] + (1 - lam) * b[:, :n_numeric]
+    return synthetic
+
+
+def train_student(teacher, X_train: np.ndarray, n_numeric: int, augment_factor: int = AUGMENT_FACTOR,
+                  random_state: int = 42):
+
+    rng = np.random.default_rng(random_state)
+    X_distill = np.vstack([X_train, augment(X_train, n_numeric, augment_factor * len(X_train), rng)])
+    soft = teacher.predict_proba(X_distill)[:, 1]
+
+    # Cross-entropy against soft targets == weighted log-loss over each row
+    # duplicated as a positive (weight p) and a negative (weight 1 - p).
+    n = len(X_distill)
+    X_fit = np.vstack([X_distill, X_distill])
+    y_fit = np.concatenate([np.ones(n), np.zeros(n)])
+    weights = np.concatenate([soft, 1 - soft])
+
+    student = HistGradientBoostingClassifier(
+        max_depth=4,
+        max_iter=300,
+        learning_rate=0.05,
+        random_state=random_state,
+    )
+    student.fit(X_fit, y_fit, sample_weight=weights)
+    return student
+
+
+def measure_latency(model, X: np.ndarray, repeats: int = LATENCY_REPEATS) -> dict:
+
+    row = X[:1]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = time.perf_counter() - start
+
+    return {
+        "single_row_ms_p50": round(float(np.median(timings)) * 1000, 3),
+        "batch_ms": round(batch * 1000, 3),
+        "batch_rows": len(X),
+        "pickled_bytes": len(pickle.dumps(model)),
+    }
+
+
+def fidelity_report(teacher, student, X_test: np.ndarray, y_test) -> dict:
+
+    from predict import get_risk_label
+
+    p_teacher = teacher.predict_proba(X_test)[:, 1]
+    p_student = student.predict_proba(X_test)[:, 1]
+
+    teacher_levels = [get_risk_label(p) for p in p_teacher]
+    student_levels = [get_risk_label(p) for p in p_student]
+
+    teacher_auc = roc_auc_score(y_test, p_teacher)
+    student_auc = roc_auc_score(y_test, p_student)
+
+    return {
+        "probability_mae": round(float(np.abs(p_teacher - p_student).mean()), 4),
+        "risk_agreement": round(float(np.mean([t == s for t, s in zip(teacher_levels, student_levels)])), 4),
+        "teacher_auc": round(float(teacher_auc), 4),
+        "student_auc": round(float(student_auc), 4),
+        "auc_delta": round(float(student_auc - teacher_auc), 4),
+    }
+
+
+def meets_thresholds(fidelity: dict, thresholds: dict = FIDELITY_THRESHOLDS) -> bool:
+
+    return (
+        fidelity["probability_mae"] <= thresholds["max_probability_mae"]
+        and fidelity["risk_agreement"] >= thresholds["min_risk_agreement"]
+        and -fidelity["auc_delta"] <= thresholds["max_auc_drop"]
+    )
+
+
+def distill_best_model(teacher, X_train, X_test, y_test, n_numeric: int,
+                       thresholds: dict = FIDELITY_THRESHOLDS, publish: bool = True) -> dict:
+
+    print("\n" + "="*50)
+    print("DISTILLING BEST MODEL")
+    print("="*50)
+
+    student = train_student(teacher, X_train, n_numeric)
+    fidelity = fidelity_report(teacher, student, X_test, y_test)
+    latency = {
+        "teacher": measure_latency(teacher, X_test),
+        "student": measure_latency(student, X_test),
+    }
+    passed = meets_thresholds(fidelity, thresholds)
+
+    print(f"Probability MAE : {fidelity['probability_mae']:.4f}")
+    print(f"Risk agreement  : {fidelity['risk_agreement']:.2%}")
+    print(f"AUC teacher → student: {fidelity['teacher_auc']:.4f} → {fidelity['student_auc']:.4f}")
+    for role in ("teacher", "student"):
+        m = latency[role]
+        print(f"{role:<8}| 1 row p50={m['single_row_ms_p50']:.2f}ms | "
+              f"{m['batch_rows']} rows={m['batch_ms']:.1f}ms | size={m['pickled_bytes'] / 1024:.0f} KB")
+
+    published = bool(publish and passed)
+    if published:
+        joblib.dump(teacher, MODELS_DIR / "teacher_model.pkl")
+        joblib.dump(student, MODELS_DIR / "best_model.pkl")
+        print("Fidelity thresholds met → student published as models/best_model.pkl "
+              "(ensemble kept in models/teacher_model.pkl)")
+    else:
+        print("Fidelity thresholds not met → keeping the ensemble as the serving model")
+
+    report = {
+        "student": type(student).__name__,
+        "fidelity": fidelity,
+        "thresholds": thresholds,
+        "latency": latency,
+        "published": published,
+    }
+    with open(MODELS_DIR / "distillation_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    print("Saved: models/distillation_report.json")
+    print("="*50 + "\n")
+
+    return report
@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+MODELS_DIR = Path("models")
+REFERENCE_PATH = MODELS_DIR / "drift_reference.json"
+
+PROBABILITY_FIELD = "attrition_probability"
+PROBABILITY_EDGES = np.linspace(0, 1, 11)[1:-1].tolist()
+MAX_EXACT_VALUES = 20
+QUANTILES = np.linspace(0, 1, 11)[1:-1]
+
+BUCKET_SECONDS = 300
+N_BUCKETS = 288
+PSI_EPSILON = 1e-4
+
+
+def numeric_sketch(values: np.ndarray, edges: list = None) -> dict:
+
+    # Edges are interior cut points: bin i holds edges[i-1] <= x < edges[i],
+    # with open-ended first and last bins so out-of-range traffic is visible.
+    values = np.asarray(values, dtype=np.float64)
+    if edges is None:
+        uniques = np.unique(values)
+        if len(uniques) <= MAX_EXACT_VALUES:
+            edges = ((uniques[:-1] + uniques[1:]) / 2).tolist()
+        else:
+            edges = np.unique(np.quantile(values, QUANTILES)).tolist()
+    counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    return {"type": "numeric", "edges": edges, "counts": counts.tolist()}
+
+
+def categorical_sketch(values) -> dict:
+
+    categories = sorted(pd.Series(values).astype(str).unique().tolist())
+    counts = pd.Series(values).astype(str).value_counts()
+    return {
+        "type": "categorical",
+        "categories": categories,
+        "counts": [int(counts.get(c, 0)) for c in categories] + [0],
+    }
+
+
+def build_reference(X: pd.DataFrame, fields: list) -> dict:
+
+    reference = {}
+    for col in fields:
+        if pd.api.types.is_numeric_dtype(X[col]):
+            reference[col] = numeric_sketch(X[col].to_numpy())
+        else:
+            reference[col] = categorical_sketch(X[col])
+    return reference
+
+
+def save_reference(reference: dict, path: Path = REFERENCE_PATH, merge: bool = False):
+
+    existing = {}
+    if merge and path.exists():
+        with open(path) as f:
+            existing = json.load(f)
+    existing.update(reference)
+    with open(path, "w") as f:
+        json.dump(existing, f, indent=2)
+    print(f"Saved: {path}")
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+
+    e = expected / max(expected.sum(), 1) + PSI_EPSILON
+    a = actual / max(actual.sum(), 1) + PSI_EPSILON
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_statistic(expected: np.ndarray, actual: np.ndarray) -> float:
+
+    e = np.cumsum(expected) / max(expected.sum(), 1)
+    a = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(e - a)))
+
+
+def drift_status(score: float) -> str:
+
+    if score < 0.10:
+        return "stable"
+    elif score < 0.25:
+        return "moderate"
+    else:
+        return "significant"
+
+
+class DriftMonitor:
+
+    def __init__(self, reference: dict, bucket_seconds: int = BUCKET_SECONDS, n_buckets: int = N_BUCKETS):
+        self.fields = list(reference)
+        self.reference = reference
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+
+        self._edges = {}
+        self._index = {}
+        for field in self.fields:
+            sketch = reference[field]
+            if sketch["type"] == "numeric":
+                self._edges[field] = np.asarray(sketch["edges"])
+            else:
+                self._index[field] = {c: j for j, c in enumerate(sketch["categories"])}
+
+        # Ring of time buckets × fields × bins; one bucket is the count table
+        # for `bucket_seconds` of traffic, so memory is fixed at construction.
+        n_bins = max(len(reference[f]["counts"]) for f in self.fields)
+        self._counts = np.zeros((n_buckets, len(self.fields), n_bins), dtype=np.int64)
+        self._bucket_ids = np.full(n_buckets, -1, dtype=np.int64)
+        self._position = {field: i for i, field in enumerate(self.fields)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = REFERENCE_PATH, **kwargs) -> "DriftMonitor":
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def _bin(self, field: str, value) -> int:
+        if field in self._edges:
+            return int(np.searchsorted(self._edges[field], float(value), side="right"))
+        index = self._index[field]
+        return index.get(str(value), len(index))
+
+    def _slot(self, now: float) -> int:
+        bucket_id = int(now // self.bucket_seconds)
+        slot = bucket_id % self.n_buckets
+        if self._bucket_ids[slot] != bucket_id:
+            self._counts[slot] = 0
+            self._bucket_ids[slot] = bucket_id
+        return slot
+
+    def update(self, record: dict, probability: float = None, now: float = None):
+        values = dict(record)
+        if probability is not None:
+            values[PROBABILITY_FIELD] = probability
+
+        cells = [
+            (self._position[field], self._bin(field, values[field]))
+            for field in self.fields if values.get(field) is not None
+        ]
+        with self._lock:
+            slot = self._slot(time.time() if now is None else now)
+            for field_pos, bin_idx in cells:
+                self._counts[slot, field_pos, bin_idx] += 1
+
+    def window_counts(self, window_seconds: int, now: float = None) -> np.ndarray:
+        current = int((time.time() if now is None else now) // self.bucket_seconds)
+        n = min(max(int(np.ceil(window_seconds / self.bucket_seconds)), 1), self.n_buckets)
+        with self._lock:
+            live = (self._bucket_ids > current - n) & (self._bucket_ids <= current)
+            return self._counts[live].sum(axis=0)
+
+    def report(self, window_seconds: int = 3600, now: float = None) -> dict:
+        counts = self.window_counts(window_seconds, now)
+
+        features = {}
+        for field, pos in self._position.items():
+            sketch = self.reference[field]
+            expected = np.asarray(sketch["counts"], dtype=np.float64)
+            actual = counts[pos, :len(expected)].astype(np.float64)
+            score = psi(expected, actual)
+            entry = {
+                "observations": int(actual.sum()),
+                "psi": round(score, 4),
+                "status": drift_status(score) if actual.sum() else "no_data",
+            }
+            if sketch["type"] == "numeric":
+                entry["ks"] = round(ks_statistic(expected, actual), 4)
+            else:
+                entry["unseen_share"] = round(float(actual[-1] / actual.sum()), 4) if actual.sum() else 0.0
+            features[field] = entry
+
+        drifted = sorted(
+            (f for f, e in features.items() if e["status"] == "significant"),
+            key=lambda f: -features[f]["psi"],
+        )
+        return {"window_seconds": window_seconds, "drifted_features": drifted, "features": features}
@@ -1,35 +1,244 @@
 import os
+import json
+import hashlib
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 import seaborn as sns
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 PLOT_DIR = Path("notebooks/eda_plots")
 PLOT_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_PATH = PLOT_DIR / ".eda_cache.json"
 
 
 sns.set_theme(style="darkgrid", palette="muted")
 COLORS = {"yes": "#E74C3C", "no": "#2ECC71", "accent": "#3498DB"}
 plt.rcParams.update({"figure.dpi": 120, "font.size": 11})
 
+SATISFACTION_COLS = [
+    "JobSatisfaction", "EnvironmentSatisfaction",
+    "RelationshipSatisfaction", "WorkLifeBalance", "Attrition"
+]
+GROUP_COLS = ["Department", "JobRole", "OverTime"]
+# Two-year bins over the full valid input range (EmployeeInput allows 18–65).
+AGE_BINS = np.linspace(18, 66, 25)
+RESERVOIR_SIZE = 10_000
+STREAM_CHUNKSIZE = 100_000
+
+
+class EdaAggregates:
+
+    def __init__(self, streaming: bool = False, reservoir_size: int = RESERVOIR_SIZE, seed: int = 42):
+        self.streaming = streaming
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+
+        self.attrition_counts = np.zeros(2, dtype=np.int64)
+        self.groups = {col: {} for col in GROUP_COLS}
+        self.age_hist = np.zeros((2, len(AGE_BINS) - 1), dtype=np.int64)
+        self.income = {0: [], 1: []}
+        self.income_seen = np.zeros(2, dtype=np.int64)
+        self.sat_cols = None
+        self.sat_n = 0
+        self.sat_sum = None
+        self.sat_cross = None
+
+    def update(self, df: pd.DataFrame):
+        attrition = df["Attrition"].to_numpy(dtype=np.int64)
+        self.attrition_counts += np.bincount(attrition, minlength=2)[:2]
+
+        for col in GROUP_COLS:
+            if col not in df.columns:
+                continue
+            keys, inverse = np.unique(df[col].to_numpy(), return_inverse=True)
+            totals = np.bincount(inverse, minlength=len(keys))
+            leavers = np.bincount(inverse, weights=attrition, minlength=len(keys))
+            table = self.groups[col]
+            for key, n, left in zip(keys.tolist(), totals, leavers):
+                prev = table.get(key, (0, 0))
+                table[key] = (prev[0] + int(n), prev[1] + int(left))
+
+        # Out-of-range ages land in the edge bins instead of being discarded.
+        age = np.clip(df["Age"].to_numpy(dtype=np.float64), AGE_BINS[0], AGE_BINS[-1])
+        income = df["MonthlyIncome"].to_numpy(dtype=np.float64)
+        for label in (0, 1):
+            mask = attrition == label
+            self.age_hist[label] += np.histogram(age[mask], bins=AGE_BINS)[0]
+            self._add_income(label, income[mask])
+
+        if self.sat_cols is None:
+            self.sat_cols = [c for c in SATISFACTION_COLS if c in df.columns]
+            self.sat_sum = np.zeros(len(self.sat_cols))
+            self.sat_cross = np.zeros((len(self.sat_cols), len(self.sat_cols)))
+        values = df[self.sat_cols].to_numpy(dtype=np.float64)
+        self.sat_n += values.shape[0]
+        self.sat_sum += values.sum(axis=0)
+        self.sat_cross += values.T @ values
+        return self
+
+    def _add_income(self, label: int, values: np.ndarray):
+        if not self.streaming:
+            self.income[label].append(values)
+            return
+
+        # Algorithm R, vectorised over the chunk: item i (0-based, global)
+        # replaces slot j ~ U[0, i] whenever j falls inside the reservoir.
+        # Fancy assignment is last-wins, matching the sequential algorithm.
+        reservoir = self.income[label]
+        seen = int(self.income_seen[label])
+        free = max(self.reservoir_size - seen, 0)
+        if free:
+            reservoir.append(values[:free])
+        rest = values[free:]
+        if len(rest):
+            sample = np.concatenate(reservoir)
+            positions = np.arange(seen + free, seen + len(values)) + 1
+            slots = self.rng.integers(0, positions)
+            keep = slots < self.reservoir_size
+            sample[slots[keep]] = rest[keep]
+            self.income[label] = [sample]
+        self.income_seen[label] += len(values)
+
+    def plot_inputs(self) -> dict:
+        def rates(col):
+            return {str(k): 100.0 * left / n for k, (n, left) in self.groups[col].items()}
+
+        n = max(self.sat_n, 1)
+        mean = self.sat_sum / n
+        cov = self.sat_cross / n - np.outer(mean, mean)
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+
+        income = {
+            label: np.concatenate(chunks) if chunks else np.empty(0)
+            for label, chunks in self.income.items()
+        }
+
+        return {
+            "01_attrition_distribution": {"counts": self.attrition_counts.tolist()},
+            "02_attrition_by_department": {"rates": rates("Department")},
+            "03_age_distribution": {"bins": AGE_BINS.tolist(), "hist": self.age_hist.tolist()},
+            "04_overtime_attrition": {"rates": rates("OverTime")},
+            "05_income_distribution": {"stayed": income[0], "left": income[1]},
+            "06_satisfaction_heatmap": {"columns": self.sat_cols, "corr": corr},
+            "07_jobrole_attrition": {"rates": rates("JobRole")},
+        }
+
+
+def compute_aggregates(df: pd.DataFrame) -> dict:
+
+    return EdaAggregates().update(df).plot_inputs()
+
+
+def _fill_values(value_counts: dict, numeric: dict) -> dict:
+
+    # Median (numeric) or mode (categorical) of each column, computed from
+    # exact value counts the way clean_data's fillna computes them.
+    fills = {}
+    for col, counts in value_counts.items():
+        values = sorted(counts)
+        if not values:
+            continue
+        if numeric[col]:
+            cum = np.cumsum([counts[v] for v in values])
+            n = cum[-1]
+            lo = values[int(np.searchsorted(cum, (n - 1) // 2, side="right"))]
+            hi = values[int(np.searchsorted(cum, n // 2, side="right"))]
+            fills[col] = (lo + hi) / 2
+        else:
+            fills[col] = max(values, key=lambda v: counts[v])
+    return fills
+
+
+def iter_clean_chunks(filepath: str, chunksize: int = STREAM_CHUNKSIZE, fills: dict = None):
+
+    # Chunk-wise equivalent of data_cleaning.clean_data: same dropped
+    # columns and Yes/No encoding, duplicates detected across chunks by row
+    # hash, and missing values filled from whole-file statistics (`fills`).
+    from data_cleaning import CONSTANT_COLUMNS
+    seen = set()
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        chunk = chunk.drop(columns=[c for c in CONSTANT_COLUMNS + ["EmployeeNumber"] if c in chunk.columns])
+        for col in ("Attrition", "OverTime"):
+            if chunk[col].dtype == object:
+                chunk[col] = chunk[col].map({"Yes": 1, "No": 0})
+
+        # Numeric columns are hashed as float so a row hashes the same
+        # whether or not a NaN elsewhere in its chunk upcast the column.
+        numeric_cols = chunk.select_dtypes("number").columns
+        hashes = pd.util.hash_pandas_object(chunk.astype({c: "float64" for c in numeric_cols}),
+                                            index=False).tolist()
+        keep = np.zeros(len(chunk), dtype=bool)
+        for i, h in enumerate(hashes):
+            if h not in seen:
+                seen.add(h)
+                keep[i] = True
+        chunk = chunk[keep]
+
+        if fills:
+            chunk = chunk.fillna({c: v for c, v in fills.items() if c in chunk.columns})
+        yield chunk
+
+
+def compute_aggregates_streaming(filepath: str, chunksize: int = STREAM_CHUNKSIZE,
+                                 reservoir_size: int = RESERVOIR_SIZE) -> dict:
+
+    # Aggregates while no missing value has been seen; a file with missing
+    # values takes a second pass once their fill values are known.
+    aggregates = EdaAggregates(streaming=True, reservoir_size=reservoir_size)
+    value_counts, numeric = {}, {}
+    has_missing = False
+    for chunk in iter_clean_chunks(filepath, chunksize):
+        for col in chunk.columns:
+            value_counts.setdefault(col, {})
+            for value, n in chunk[col].value_counts().items():
+                value_counts[col][value] = value_counts[col].get(value, 0) + n
+            numeric[col] = numeric.get(col, True) and pd.api.types.is_numeric_dtype(chunk[col])
+        has_missing = has_missing or bool(chunk.isnull().values.any())
+        if not has_missing:
+            aggregates.update(chunk)
+
+    if has_missing:
+        fills = _fill_values(value_counts, numeric)
+        aggregates = EdaAggregates(streaming=True, reservoir_size=reservoir_size)
+        for chunk in iter_clean_chunks(filepath, chunksize, fills):
+            aggregates.update(chunk)
+    return aggregates.plot_inputs()
+
+
+def hash_inputs(inputs: dict) -> str:
+
+    digest = hashlib.sha256()
+    for key in sorted(inputs):
+        value = inputs[key]
+        digest.update(key.encode())
+        if isinstance(value, np.ndarray):
+            digest.update(str(value.dtype).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def plot_attrition_distribution(inputs: dict):
 
-def plot_attrition_distribution(df: pd.DataFrame):
-    
     fig, axes = plt.subplots(1, 2, figsize=(12, 4))
     fig.suptitle("Employee Attrition Overview", fontsize=14, fontweight="bold")
 
-    counts = df["Attrition"].value_counts()
-    axes[0].bar(["Stayed", "Left"], counts.values,
+    counts = inputs["counts"]
+    axes[0].bar(["Stayed", "Left"], counts,
                 color=[COLORS["no"], COLORS["yes"]], edgecolor="white", linewidth=1.5)
     axes[0].set_title("Attrition Count")
     axes[0].set_ylabel("Number of Employees")
-    for i, v in enumerate(counts.values):
+    for i, v in enumerate(counts):
         axes[0].text(i, v + 5, str(v), ha="center", fontweight="bold")
 
-   
-    axes[1].pie(counts.values, labels=["Stayed", "Left"],
+
+    axes[1].pie(counts, labels=["Stayed", "Left"],
                 colors=[COLORS["no"], COLORS["yes"]],
                 autopct="%1.1f%%", startangle=90,
                 wedgeprops={"edgecolor": "white", "linewidth": 2})
@@ -41,9 +250,9 @@ def plot_attrition_distribution(df: pd.DataFrame):
     print("Saved: 01_attrition_distribution.png")
 
 
-def plot_attrition_by_department(df: pd.DataFrame):
-    
-    dept_attr = df.groupby("Department")["Attrition"].mean().sort_values(ascending=False) * 100
+def plot_attrition_by_department(inputs: dict):
+
+    dept_attr = pd.Series(inputs["rates"]).sort_values(ascending=False)
 
     fig, ax = plt.subplots(figsize=(9, 5))
     bars = ax.barh(dept_attr.index, dept_attr.values,
@@ -62,13 +271,16 @@ def plot_attrition_by_department(df: pd.DataFrame):
     print("Saved: 02_attrition_by_department.png")
 
 
-def plot_age_distribution(df: pd.DataFrame):
-    
+def plot_age_distribution(inputs: dict):
+
+    bins = np.asarray(inputs["bins"])
+    stayed, left = inputs["hist"]
+
     fig, ax = plt.subplots(figsize=(10, 5))
-    df[df["Attrition"] == 0]["Age"].plot.hist(ax=ax, alpha=0.6, color=COLORS["no"],
-                                               label="Stayed", bins=20, edgecolor="white")
-    df[df["Attrition"] == 1]["Age"].plot.hist(ax=ax, alpha=0.6, color=COLORS["yes"],
-                                               label="Left", bins=20, edgecolor="white")
+    ax.hist(bins[:-1], bins=bins, weights=stayed, alpha=0.6, color=COLORS["no"],
+            label="Stayed", edgecolor="white")
+    ax.hist(bins[:-1], bins=bins, weights=left, alpha=0.6, color=COLORS["yes"],
+            label="Left", edgecolor="white")
     ax.set_xlabel("Age")
     ax.set_ylabel("Count")
     ax.set_title("Age Distribution by Attrition", fontweight="bold")
@@ -79,9 +291,9 @@ def plot_age_distribution(df: pd.DataFrame):
     print("Saved: 03_age_distribution.png")
 
 
-def plot_overtime_attrition(df: pd.DataFrame):
-    
-    ot_attr = df.groupby("OverTime")["Attrition"].mean() * 100
+def plot_overtime_attrition(inputs: dict):
+
+    ot_attr = pd.Series(inputs["rates"]).sort_index()
     labels = ["No Overtime", "Works Overtime"]
 
     fig, ax = plt.subplots(figsize=(7, 4))
@@ -101,11 +313,11 @@ def plot_overtime_attrition(df: pd.DataFrame):
     print("Saved: 04_overtime_attrition.png")
 
 
-def plot_salary_vs_attrition(df: pd.DataFrame):
-    
+def plot_salary_vs_attrition(inputs: dict):
+
     fig, ax = plt.subplots(figsize=(10, 5))
-    df[df["Attrition"] == 0]["MonthlyIncome"].plot.kde(ax=ax, color=COLORS["no"], label="Stayed", linewidth=2)
-    df[df["Attrition"] == 1]["MonthlyIncome"].plot.kde(ax=ax, color=COLORS["yes"], label="Left", linewidth=2)
+    pd.Series(inputs["stayed"]).plot.kde(ax=ax, color=COLORS["no"], label="Stayed", linewidth=2)
+    pd.Series(inputs["left"]).plot.kde(ax=ax, color=COLORS["yes"], label="Left", linewidth=2)
     ax.set_xlabel("Monthly Income ($)")
     ax.set_title("Income Distribution by Attrition", fontweight="bold")
     ax.legend()
@@ -117,14 +329,9 @@ def plot_salary_vs_attrition(df: pd.DataFrame):
     print("Saved: 05_income_distribution.png")
 
 
-def plot_satisfaction_heatmap(df: pd.DataFrame):
-    
-    sat_cols = [
-        "JobSatisfaction", "EnvironmentSatisfaction",
-        "RelationshipSatisfaction", "WorkLifeBalance", "Attrition"
-    ]
-    existing = [c for c in sat_cols if c in df.columns]
-    corr = df[existing].corr()
+def plot_satisfaction_heatmap(inputs: dict):
+
+    corr = pd.DataFrame(inputs["corr"], index=inputs["columns"], columns=inputs["columns"])
 
     fig, ax = plt.subplots(figsize=(8, 6))
     sns.heatmap(corr, annot=True, fmt=".2f", cmap="RdYlGn",
@@ -137,9 +344,9 @@ def plot_satisfaction_heatmap(df: pd.DataFrame):
     print("Saved: 06_satisfaction_heatmap.png")
 
 
-def plot_jobrole_attrition(df: pd.DataFrame):
- 
-    role_attr = df.groupby("JobRole")["Attrition"].mean().sort_values(ascending=True) * 100
+def plot_jobrole_attrition(inputs: dict):
+
+    role_attr = pd.Series(inputs["rates"]).sort_values(ascending=True)
     colors = plt.cm.RdYlGn_r(np.linspace(0.2, 0.8, len(role_attr)))
 
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -158,26 +365,84 @@ def plot_jobrole_attrition(df: pd.DataFrame):
     print("Saved: 07_jobrole_attrition.png")
 
 
-def run_eda(df: pd.DataFrame):
-    
+PLOTS = {
+    "01_attrition_distribution": plot_attrition_distribution,
+    "02_attrition_by_department": plot_attrition_by_department,
+    "03_age_distribution": plot_age_distribution,
+    "04_overtime_attrition": plot_overtime_attrition,
+    "05_income_distribution": plot_salary_vs_attrition,
+    "06_satisfaction_heatmap": plot_satisfaction_heatmap,
+    "07_jobrole_attrition": plot_jobrole_attrition,
+}
+
+
+def load_plot_cache() -> dict:
+
+    if not CACHE_PATH.exists():
+        return {}
+    with open(CACHE_PATH) as f:
+        return json.load(f)
+
+
+def render_plots(plot_inputs: dict, force: bool = False, max_workers: int = None) -> list:
+
+    cache = {} if force else load_plot_cache()
+    hashes = {name: hash_inputs(inputs) for name, inputs in plot_inputs.items()}
+
+    stale = [
+        name for name in PLOTS
+        if cache.get(name) != hashes[name] or not (PLOT_DIR / f"{name}.png").exists()
+    ]
+    for name in PLOTS:
+        if name not in stale:
+            print(f"Unchanged: {name}.png")
+
+    if stale:
+        workers = min(len(stale), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(PLOTS[name], plot_inputs[name]) for name in stale]
+            for future in futures:
+                future.result()
+
+    with open(CACHE_PATH, "w") as f:
+        json.dump(hashes, f, indent=2)
+
+    return stale
+
+
+def run_eda(df: pd.DataFrame = None, filepath: str = None, streaming: bool = False,
+            force: bool = False, max_workers: int = None):
+
     print("\n" + "="*50)
     print("STEP 4: EXPLORATORY DATA ANALYSIS")
     print("="*50)
     print(f"Output directory: {PLOT_DIR.resolve()}\n")
 
-    plot_attrition_distribution(df)
-    plot_attrition_by_department(df)
-    plot_age_distribution(df)
-    plot_overtime_attrition(df)
-    plot_salary_vs_attrition(df)
-    plot_satisfaction_heatmap(df)
-    plot_jobrole_attrition(df)
+    if streaming:
+        if filepath is None:
+            raise ValueError("Streaming EDA reads the CSV in chunks: pass filepath")
+        plot_inputs = compute_aggregates_streaming(filepath)
+    else:
+        plot_inputs = compute_aggregates(df)
+
+    rendered = render_plots(plot_inputs, force=force, max_workers=max_workers)
 
-    print(f"\nEDA complete → {len(list(PLOT_DIR.glob('*.png')))} plots saved")
+    print(f"\nEDA complete → {len(rendered)} plots rendered, "
+          f"{len(PLOTS) - len(rendered)} unchanged")
     print("="*50 + "\n")
 
 
 if __name__ == "__main__":
-    from data_cleaning import clean_data
-    df = clean_data("data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
-    run_eda(df)
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    if args.streaming:
+        run_eda(filepath=args.data, streaming=True, force=args.force)
+    else:
+        from data_cleaning import clean_data
+        df = clean_data(args.data)
+        run_eda(df, force=args.force)
@@ -0,0 +1,137 @@
+import numpy as np
+
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6)
+DECISION_THRESHOLD = 0.5
+N_BOOTSTRAP = 2000
+CI_LEVEL = 0.95
+SELECTION_METRIC = "ROC-AUC"
+
+
+def batch_roc_auc(y: np.ndarray, p: np.ndarray) -> np.ndarray:
+
+    # ROC-AUC for every row of (B, n) label / probability matrices at once,
+    # as P(score_pos > score_neg) + 0.5 * P(tie). Row r is shifted into
+    # [2r, 2r + 1] so a single global sort keeps rows apart; each positive
+    # then counts the negatives of its own row below / equal to it.
+    y = np.atleast_2d(y).astype(bool)
+    p = np.atleast_2d(p).astype(np.float64)
+    B = p.shape[0]
+
+    shifted = p + 2.0 * np.arange(B)[:, None]
+    neg = np.sort(shifted[~y])
+    pos_rows, _ = np.nonzero(y)
+    pos = shifted[y]
+
+    row_start = np.searchsorted(neg, 2.0 * np.arange(B), side="left")[pos_rows]
+    below = np.searchsorted(neg, pos, side="left") - row_start
+    at_or_below = np.searchsorted(neg, pos, side="right") - row_start
+    wins = np.bincount(pos_rows, weights=(below + at_or_below) / 2.0, minlength=B)
+
+    n_pos = y.sum(axis=1)
+    n_neg = y.shape[1] - n_pos
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return wins / (n_pos * n_neg)
+
+
+def confusion_metrics(tp, fp, fn, tn) -> dict:
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    accuracy = (tp + tn) / (tp + fp + fn + tn)
+    return {"F1-Score": f1, "Precision": precision, "Recall": recall, "Accuracy": accuracy}
+
+
+def threshold_metrics(y: np.ndarray, p: np.ndarray, thresholds=THRESHOLDS) -> dict:
+
+    # Sort once by descending probability; the confusion matrix at any
+    # threshold is then a prefix of the cumulative positive count.
+    order = np.argsort(-p, kind="mergesort")
+    cum_pos = np.concatenate([[0], np.cumsum(y[order])])
+    n_pos = int(y.sum())
+    n_neg = len(y) - n_pos
+
+    sorted_desc = p[order]
+    results = {}
+    for t in thresholds:
+        k = int(np.searchsorted(-sorted_desc, -t, side="right"))
+        tp = cum_pos[k]
+        fp = k - tp
+        metrics = confusion_metrics(np.float64(tp), np.float64(fp), np.float64(n_pos - tp), np.float64(n_neg - fp))
+        results[f"{t:.2f}"] = {name: round(float(v), 4) for name, v in metrics.items()}
+    return results
+
+
+def bootstrap_metrics(y_boot: np.ndarray, p_boot: np.ndarray, threshold: float = DECISION_THRESHOLD) -> dict:
+
+    pred = p_boot >= threshold
+    actual = y_boot.astype(bool)
+    tp = (pred & actual).sum(axis=1).astype(np.float64)
+    fp = (pred & ~actual).sum(axis=1).astype(np.float64)
+    fn = (~pred & actual).sum(axis=1).astype(np.float64)
+    tn = (~pred & ~actual).sum(axis=1).astype(np.float64)
+    return {"ROC-AUC": batch_roc_auc(y_boot, p_boot), **confusion_metrics(tp, fp, fn, tn)}
+
+
+class EvaluationEngine:
+
+    def __init__(self, X_test, y_test, n_bootstrap: int = N_BOOTSTRAP, ci_level: float = CI_LEVEL,
+                 thresholds=THRESHOLDS, random_state: int = 42):
+        self.X_test = X_test
+        self.y_test = np.asarray(y_test).astype(np.int64)
+        self.thresholds = thresholds
+        self.ci_level = ci_level
+        # One resample matrix shared by every model, so model-vs-model
+        # comparisons are paired on the same bootstrap draws.
+        rng = np.random.default_rng(random_state)
+        self.boot_idx = rng.integers(0, len(self.y_test), size=(n_bootstrap, len(self.y_test)))
+        self._y_boot = self.y_test[self.boot_idx]
+        self._probabilities = {}
+        self._names = {}
+        self._reports = {}
+
+    def probabilities(self, model) -> np.ndarray:
+        key = id(model)
+        if key not in self._probabilities:
+            self._probabilities[key] = model.predict_proba(self.X_test)[:, 1]
+        return self._probabilities[key]
+
+    def score(self, model, name: str) -> dict:
+        self._names[name] = model
+        report = self.report(name)
+        return {"Model": name, **report["metrics"]}
+
+    def report(self, name: str) -> dict:
+        if name in self._reports:
+            return self._reports[name]
+
+        p = self.probabilities(self._names[name])
+        y = self.y_test
+
+        point = threshold_metrics(y, p, self.thresholds)
+        metrics = {"ROC-AUC": float(batch_roc_auc(y, p)[0]), **point[f"{DECISION_THRESHOLD:.2f}"]}
+
+        boot = bootstrap_metrics(self._y_boot, p[self.boot_idx])
+        alpha = (1 - self.ci_level) / 2
+        ci = {
+            metric: [round(float(v), 4) for v in np.nanquantile(values, [alpha, 1 - alpha])]
+            for metric, values in boot.items()
+        }
+
+        report = {
+            "metrics": {k: round(v, 4) for k, v in metrics.items()},
+            "ci": ci,
+            "ci_level": self.ci_level,
+            "thresholds": point,
+        }
+        self._reports[name] = report
+        return report
+
+    def select_best(self, models: dict, metric: str = SELECTION_METRIC) -> str:
+        # Rank by the lower confidence bound rather than the point estimate,
+        # so a model only wins if it is better beyond resampling noise.
+        for name, model in models.items():
+            self._names[name] = model
+        return max(models, key=lambda name: (self.report(name)["ci"][metric][0],
+                                               self.report(name)["metrics"][metric]))
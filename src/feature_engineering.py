@@ -1,92 +1,171 @@
 import pandas as pd
 import numpy as np
+from functools import lru_cache
+from typing import Callable, NamedTuple, Tuple
 
 
-def add_years_per_promotion(df: pd.DataFrame) -> pd.DataFrame:
-    df["YearsPerPromotion"] = df["YearsAtCompany"] / (df["YearsWithCurrManager"] + 1)
-    return df
+class FeatureSpec(NamedTuple):
+    name: str
+    inputs: Tuple[str, ...]
+    compute: Callable
 
 
-def add_salary_growth_gap(df: pd.DataFrame) -> pd.DataFrame:
-    avg_hike = df["PercentSalaryHike"].mean()
-    df["SalaryGrowthGap"] = df["PercentSalaryHike"] - avg_hike
-    return df
+# Each compute function receives a mapping of column name -> contiguous 1-D
+# float64 array (raw inputs and already-computed features), the output row
+# to write into, and `per_row`. Batch statistics (e.g. the salary hike mean)
+# are taken over the whole batch unless `per_row` is set, in which case every
+# row is treated as a batch of one — exactly what a single-row request sees.
 
+def _years_per_promotion(cols, out, per_row):
+    np.add(cols["YearsWithCurrManager"], 1, out=out)
+    np.divide(cols["YearsAtCompany"], out, out=out)
 
-def add_satisfaction_composite(df: pd.DataFrame) -> pd.DataFrame:
-    satisfaction_cols = [
-        "JobSatisfaction",
-        "EnvironmentSatisfaction",
-        "RelationshipSatisfaction",
-        "WorkLifeBalance",
-    ]
-    existing = [c for c in satisfaction_cols if c in df.columns]
-    df["SatisfactionComposite"] = df[existing].mean(axis=1)
-    return df
 
+def _salary_growth_gap(cols, out, per_row):
+    hike = cols["PercentSalaryHike"]
+    np.subtract(hike, hike if per_row else hike.mean(), out=out)
 
-def add_engagement_score(df: pd.DataFrame) -> pd.DataFrame:
-    df["EngagementScore"] = (
-        df.get("JobInvolvement", 2) * 0.4 +
-        df.get("JobSatisfaction", 2) * 0.3 +
-        df.get("WorkLifeBalance", 2) * 0.3
-    )
-    return df
 
+def _satisfaction_composite(cols, out, per_row):
+    np.add(cols["JobSatisfaction"], cols["EnvironmentSatisfaction"], out=out)
+    out += cols["RelationshipSatisfaction"]
+    out += cols["WorkLifeBalance"]
+    out /= 4
 
-def add_career_velocity(df: pd.DataFrame) -> pd.DataFrame:
-    df["CareerVelocity"] = df["JobLevel"] / (df["YearsAtCompany"] + 1)
-    return df
 
+def _engagement_score(cols, out, per_row):
+    np.multiply(cols["JobInvolvement"], 0.4, out=out)
+    out += cols["JobSatisfaction"] * 0.3
+    out += cols["WorkLifeBalance"] * 0.3
 
-def add_overtime_seniority_risk(df: pd.DataFrame) -> pd.DataFrame:
-    df["OvertimeSeniorityRisk"] = df["OverTime"] * df["TotalWorkingYears"]
-    return df
 
+def _career_velocity(cols, out, per_row):
+    np.add(cols["YearsAtCompany"], 1, out=out)
+    np.divide(cols["JobLevel"], out, out=out)
 
-def add_loyalty_score(df: pd.DataFrame) -> pd.DataFrame:
-    df["LoyaltyScore"] = df["YearsAtCompany"] / (df["TotalWorkingYears"] + 1)
-    return df
 
+def _overtime_seniority_risk(cols, out, per_row):
+    np.multiply(cols["OverTime"], cols["TotalWorkingYears"], out=out)
 
-def add_distance_worklife_risk(df: pd.DataFrame) -> pd.DataFrame:
-    df["DistanceWorklifeRisk"] = df["DistanceFromHome"] * (5 - df["WorkLifeBalance"])
-    return df
 
+def _loyalty_score(cols, out, per_row):
+    np.add(cols["TotalWorkingYears"], 1, out=out)
+    np.divide(cols["YearsAtCompany"], out, out=out)
 
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
-    
-    print("\n" + "="*50)
-    print("STEP 5: FEATURE ENGINEERING")
-    print("="*50)
-
-    original_cols = df.shape[1]
-
-    df = add_years_per_promotion(df)
-    df = add_salary_growth_gap(df)
-    df = add_satisfaction_composite(df)
-    df = add_engagement_score(df)
-    df = add_career_velocity(df)
-    df = add_overtime_seniority_risk(df)
-    df = add_loyalty_score(df)
-    df = add_distance_worklife_risk(df)
-
-    new_features = df.shape[1] - original_cols
-    print(f"Created {new_features} new features:")
-    new_cols = [
-        "YearsPerPromotion", "SalaryGrowthGap", "SatisfactionComposite",
-        "EngagementScore", "CareerVelocity", "OvertimeSeniorityRisk",
-        "LoyaltyScore", "DistanceWorklifeRisk"
+
+def _distance_worklife_risk(cols, out, per_row):
+    np.subtract(5, cols["WorkLifeBalance"], out=out)
+    out *= cols["DistanceFromHome"]
+
+
+FEATURE_REGISTRY = {
+    spec.name: spec for spec in [
+        FeatureSpec("YearsPerPromotion", ("YearsAtCompany", "YearsWithCurrManager"), _years_per_promotion),
+        FeatureSpec("SalaryGrowthGap", ("PercentSalaryHike",), _salary_growth_gap),
+        FeatureSpec("SatisfactionComposite", ("JobSatisfaction", "EnvironmentSatisfaction",
+                                              "RelationshipSatisfaction", "WorkLifeBalance"),
+                    _satisfaction_composite),
+        FeatureSpec("EngagementScore", ("JobInvolvement", "JobSatisfaction", "WorkLifeBalance"),
+                    _engagement_score),
+        FeatureSpec("CareerVelocity", ("JobLevel", "YearsAtCompany"), _career_velocity),
+        FeatureSpec("OvertimeSeniorityRisk", ("OverTime", "TotalWorkingYears"), _overtime_seniority_risk),
+        FeatureSpec("LoyaltyScore", ("YearsAtCompany", "TotalWorkingYears"), _loyalty_score),
+        FeatureSpec("DistanceWorklifeRisk", ("DistanceFromHome", "WorkLifeBalance"), _distance_worklife_risk),
     ]
-    for col in new_cols:
-        print(f"   + {col}")
+}
+
+
+class FeaturePlan:
+
+    def __init__(self, features: Tuple[str, ...]):
+        self.features = features
+        self.steps = []
+        self.inputs = []
+
+        visiting = set()
+
+        def visit(name):
+            if name in self.steps:
+                return
+            if name in visiting:
+                raise ValueError(f"Cyclic feature dependency at '{name}'")
+            visiting.add(name)
+            for dep in FEATURE_REGISTRY[name].inputs:
+                if dep in FEATURE_REGISTRY:
+                    visit(dep)
+                elif dep not in self.inputs:
+                    self.inputs.append(dep)
+            visiting.discard(name)
+            self.steps.append(name)
+
+        for name in features:
+            visit(name)
+
+        self.output_rows = [self.steps.index(name) for name in features]
+
+    def evaluate(self, inputs: np.ndarray, per_row: bool = False) -> np.ndarray:
+        # `inputs` is (len(self.inputs), n_rows) so that each column is a
+        # contiguous row; the result is (len(self.features), n_rows).
+        inputs = np.ascontiguousarray(inputs, dtype=np.float64)
+        out = np.empty((len(self.steps), inputs.shape[1]), dtype=np.float64)
+
+        cols = dict(zip(self.inputs, inputs))
+        for i, name in enumerate(self.steps):
+            FEATURE_REGISTRY[name].compute(cols, out[i], per_row)
+            cols[name] = out[i]
+
+        if self.output_rows == list(range(len(self.steps))):
+            return out
+        return out[self.output_rows]
+
+    def input_array(self, df: pd.DataFrame) -> np.ndarray:
+        missing = [c for c in self.inputs if c not in df.columns]
+        if missing:
+            raise KeyError(f"Missing input columns for feature engineering: {missing}")
+
+        arr = np.empty((len(self.inputs), len(df)), dtype=np.float64)
+        for i, col in enumerate(self.inputs):
+            arr[i] = df[col].to_numpy(dtype=np.float64)
+        return arr
+
+
+@lru_cache(maxsize=32)
+def compile_features(features: Tuple[str, ...] = tuple(FEATURE_REGISTRY)) -> FeaturePlan:
+
+    unknown = [f for f in features if f not in FEATURE_REGISTRY]
+    if unknown:
+        raise KeyError(f"Unknown engineered features: {unknown}")
+    return FeaturePlan(tuple(features))
+
+
+def engineered_features_in(feature_list: list) -> tuple:
+
+    return tuple(f for f in feature_list if f in FEATURE_REGISTRY)
+
+
+def engineer_features(df: pd.DataFrame, features: tuple = None, per_row: bool = False,
+                      verbose: bool = False) -> pd.DataFrame:
+
+    plan = compile_features(tuple(FEATURE_REGISTRY) if features is None else tuple(features))
+    values = plan.evaluate(plan.input_array(df), per_row=per_row)
+
+    for name, column in zip(plan.features, values):
+        df[name] = column
+
+    if verbose:
+        print("\n" + "="*50)
+        print("STEP 5: FEATURE ENGINEERING")
+        print("="*50)
+        print(f"Created {len(plan.features)} new features:")
+        for col in plan.features:
+            print(f"   + {col}")
+        print("="*50 + "\n")
 
-    print("="*50 + "\n")
     return df
 
 
 if __name__ == "__main__":
     from data_cleaning import clean_data
     df = clean_data("data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
-    df = engineer_features(df)
+    df = engineer_features(df, verbose=True)
     print(df[["YearsPerPromotion", "SatisfactionComposite", "EngagementScore"]].describe())
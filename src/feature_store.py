@@ -0,0 +1,174 @@
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+FEATURE_STORE_PATH = Path("data/feature_store.db")
+ID_COLUMN = "EmployeeNumber"
+CHUNK_ROWS = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    employee_id TEXT PRIMARY KEY,
+    raw TEXT NOT NULL,
+    features BLOB,
+    preprocessing_version TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def raw_fields(feature_list: list) -> list:
+
+    from feature_engineering import FEATURE_REGISTRY
+    return [c for c in feature_list if c not in FEATURE_REGISTRY]
+
+
+def vectorize(df: pd.DataFrame, preprocessor, feature_list: list) -> np.ndarray:
+
+    from predict import prepare_features
+    return np.ascontiguousarray(preprocessor.transform(prepare_features(df, feature_list)), dtype=np.float64)
+
+
+class FeatureStore:
+
+    def __init__(self, path: Path = FEATURE_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    def upsert(self, ids: list, raws: list, vectors: np.ndarray, version: str):
+        now = time.time()
+        rows = [
+            (str(emp_id), json.dumps(raw), vector.tobytes(), version, now)
+            for emp_id, raw, vector in zip(ids, raws, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO employees VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(employee_id) DO UPDATE SET raw = excluded.raw, features = excluded.features, "
+                "preprocessing_version = excluded.preprocessing_version, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def set_vectors(self, ids: list, vectors: np.ndarray, version: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE employees SET features = ?, preprocessing_version = ?, updated_at = ? "
+                "WHERE employee_id = ?",
+                [(vector.tobytes(), version, now, str(emp_id)) for emp_id, vector in zip(ids, vectors)],
+            )
+
+    def get(self, employee_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw, features, preprocessing_version FROM employees WHERE employee_id = ?",
+                (str(employee_id),),
+            ).fetchone()
+        if row is None:
+            return None
+        raw, blob, version = row
+        vector = np.frombuffer(blob, dtype=np.float64) if blob is not None else None
+        return json.loads(raw), vector, version
+
+    def stale(self, version: str, limit: int = CHUNK_ROWS) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT employee_id, raw FROM employees "
+                "WHERE preprocessing_version IS NOT ? OR features IS NULL LIMIT ?",
+                (version, limit),
+            ).fetchall()
+        return [(emp_id, json.loads(raw)) for emp_id, raw in rows]
+
+    def invalidate(self):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE employees SET features = NULL, preprocessing_version = NULL")
+
+    def lookup_vector(self, employee_id, preprocessor, feature_list: list, version: str):
+        # Returns (raw fields, preprocessed vector), recomputing and writing
+        # back the vector if it was built by a different preprocessor.
+        entry = self.get(employee_id)
+        if entry is None:
+            return None
+        raw, vector, stored_version = entry
+        if vector is None or stored_version != version:
+            vector = vectorize(pd.DataFrame([raw]), preprocessor, feature_list)[0]
+            self.set_vectors([employee_id], vector[None, :], version)
+        return raw, vector
+
+
+def ingest(filepath: str, store: FeatureStore, chunk_rows: int = CHUNK_ROWS) -> int:
+
+    from data_cleaning import clean_data
+    from predict import load_artifacts, get_preprocessing_version
+
+    df = clean_data(filepath, keep_ids=True)
+    if ID_COLUMN not in df.columns:
+        raise KeyError(f"'{ID_COLUMN}' column is required to ingest into the feature store")
+
+    _, preprocessor, feature_list = load_artifacts()
+    version = get_preprocessing_version()
+    fields = raw_fields(feature_list)
+
+    for begin in range(0, len(df), chunk_rows):
+        chunk = df.iloc[begin:begin + chunk_rows]
+        vectors = vectorize(chunk, preprocessor, feature_list)
+        store.upsert(chunk[ID_COLUMN].tolist(), chunk[fields].to_dict("records"), vectors, version)
+
+    print(f"Ingested {len(df)} employees into {store.path} (preprocessing version {version})")
+    return len(df)
+
+
+def refresh(store: FeatureStore, chunk_rows: int = CHUNK_ROWS) -> int:
+
+    from predict import load_artifacts, get_preprocessing_version
+
+    _, preprocessor, feature_list = load_artifacts()
+    version = get_preprocessing_version()
+
+    refreshed = 0
+    while True:
+        stale = store.stale(version, chunk_rows)
+        if not stale:
+            break
+        ids = [emp_id for emp_id, _ in stale]
+        vectors = vectorize(pd.DataFrame([raw for _, raw in stale]), preprocessor, feature_list)
+        store.set_vectors(ids, vectors, version)
+        refreshed += len(ids)
+
+    print(f"Refreshed {refreshed} stale feature vectors (preprocessing version {version})")
+    return refreshed
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Manage the local employee feature store")
+    parser.add_argument("command", choices=["ingest", "refresh", "invalidate"])
+    parser.add_argument("--data", default="data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
+    parser.add_argument("--db", type=Path, default=FEATURE_STORE_PATH)
+    args = parser.parse_args()
+
+    store = FeatureStore(args.db)
+    if args.command == "ingest":
+        ingest(args.data, store)
+    elif args.command == "refresh":
+        refresh(store)
+    else:
+        store.invalidate()
+        print("All stored feature vectors invalidated")
+    store.close()
@@ -0,0 +1,120 @@
+import json
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from threadpoolctl import threadpool_limits
+
+from evaluation import batch_roc_auc
+
+MODELS_DIR = Path("models")
+IMPORTANCE_PATH = MODELS_DIR / "feature_importance.json"
+N_REPEATS = 10
+
+_WORKER = {}
+
+
+def column_groups(preprocessor) -> dict:
+
+    # Map every original input field to its columns in the transformed matrix:
+    # one column per numeric field, the whole one-hot block per categorical.
+    numeric_cols = preprocessor.transformers_[0][2]
+    categorical_cols = preprocessor.transformers_[1][2]
+    encoder = preprocessor.named_transformers_["cat"].named_steps["encoder"]
+
+    groups = {}
+    idx = 0
+    for col in numeric_cols:
+        groups[col] = [idx]
+        idx += 1
+    for col, categories in zip(categorical_cols, encoder.categories_):
+        groups[col] = list(range(idx, idx + len(categories)))
+        idx += len(categories)
+    return groups
+
+
+def _init_worker(model, X, y, threads):
+    _WORKER.update(model=model, X=X, y=y)
+    threadpool_limits(limits=threads)
+
+
+def _permuted_auc(task) -> tuple:
+    field, cols, seed = task
+    X, y, model = _WORKER["X"], _WORKER["y"], _WORKER["model"]
+
+    perm = np.random.default_rng(seed).permutation(len(X))
+    X_perm = X.copy()
+    X_perm[:, cols] = X[perm][:, cols]
+    return field, float(batch_roc_auc(y, model.predict_proba(X_perm)[:, 1])[0])
+
+
+def permutation_importance(model, X, y, groups: dict, baseline_probabilities: np.ndarray = None,
+                           n_repeats: int = N_REPEATS, n_workers: int = 1, threads: int = 1,
+                           random_state: int = 42) -> dict:
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y).astype(np.int64)
+    if baseline_probabilities is None:
+        baseline_probabilities = model.predict_proba(X)[:, 1]
+    baseline = float(batch_roc_auc(y, baseline_probabilities)[0])
+
+    seeds = np.random.default_rng(random_state).integers(0, 2**31, size=n_repeats)
+    tasks = [(field, cols, int(seed)) for field, cols in groups.items() for seed in seeds]
+
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(model, X, y, threads)) as pool:
+            results = list(pool.map(_permuted_auc, tasks, chunksize=max(1, len(tasks) // (4 * n_workers))))
+    else:
+        _init_worker(model, X, y, threads)
+        results = [_permuted_auc(task) for task in tasks]
+
+    drops = {field: [] for field in groups}
+    for field, auc in results:
+        drops[field].append(baseline - auc)
+
+    importances = {
+        field: {"mean": round(float(np.mean(d)), 5), "std": round(float(np.std(d)), 5)}
+        for field, d in drops.items()
+    }
+    return {
+        "metric": "ROC-AUC drop",
+        "baseline": round(baseline, 4),
+        "n_repeats": n_repeats,
+        "importances": dict(sorted(importances.items(), key=lambda kv: -kv[1]["mean"])),
+    }
+
+
+def load_cached(model_version: str, path: Path = IMPORTANCE_PATH):
+
+    if not path.exists():
+        return None
+    with open(path) as f:
+        cached = json.load(f)
+    return cached if cached.get("model_version") == model_version else None
+
+
+def compute_feature_importance(model, X, y, preprocessor, model_version: str,
+                               baseline_probabilities: np.ndarray = None, n_workers: int = 1,
+                               threads: int = 1, path: Path = IMPORTANCE_PATH) -> dict:
+
+    cached = load_cached(model_version, path)
+    if cached is not None:
+        print(f"Feature importance unchanged for model {model_version} → reusing {path}")
+        return cached
+
+    print(f"Computing permutation importance ({N_REPEATS} repeats, {n_workers} workers)...")
+    result = permutation_importance(
+        model, X, y, column_groups(preprocessor),
+        baseline_probabilities=baseline_probabilities,
+        n_workers=n_workers, threads=threads,
+    )
+    result = {"model_version": model_version, **result}
+
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved: {path}")
+
+    for field, imp in list(result["importances"].items())[:10]:
+        print(f"   {field:<28} {imp['mean']:+.4f} ± {imp['std']:.4f}")
+    return result
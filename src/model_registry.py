@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import threading
+import time
+import joblib
+from collections import OrderedDict
+from pathlib import Path
+
+MODELS_DIR = Path("models")
+DEFAULT_MODEL_ID = "default"
+MEMORY_BUDGET_MB = int(os.environ.get("ATTRITION_MODEL_MEMORY_MB", 1024))
+PINNED_MODELS = [m for m in os.environ.get("ATTRITION_PINNED_MODELS", "").split(",") if m]
+ARTIFACT_FILES = ["best_model.pkl", "preprocessor.pkl", "feature_list.json"]
+MODEL_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class ModelBundle:
+
+    __slots__ = ("model_id", "model", "preprocessor", "feature_list", "size_bytes", "mtime_ns")
+
+    def __init__(self, model_id, model, preprocessor, feature_list, size_bytes, mtime_ns):
+        self.model_id = model_id
+        self.model = model
+        self.preprocessor = preprocessor
+        self.feature_list = feature_list
+        self.size_bytes = size_bytes
+        self.mtime_ns = mtime_ns
+
+    def artifacts(self) -> tuple:
+        return self.model, self.preprocessor, self.feature_list
+
+
+class ModelRegistry:
+
+    def __init__(self, root: Path = MODELS_DIR, memory_budget_mb: int = MEMORY_BUDGET_MB,
+                 pinned: list = PINNED_MODELS):
+        self.root = Path(root)
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.pinned = set(pinned)
+        self._bundles = OrderedDict()
+        self._model_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def path_for(self, model_id: str = None) -> Path:
+        # The default model lives directly in models/, per-unit models in
+        # models/<model_id>/ with the same three artifact files.
+        if model_id in (None, DEFAULT_MODEL_ID):
+            return self.root
+        if not MODEL_ID_PATTERN.match(model_id):
+            raise ValueError(f"Invalid model id '{model_id}'")
+        return self.root / model_id
+
+    def _stat(self, model_id: str) -> dict:
+        return self._stats.setdefault(model_id, {
+            "hits": 0, "loads": 0, "evictions": 0, "load_seconds": 0.0, "last_access": None,
+        })
+
+    def _hit(self, model_id: str):
+        self._bundles.move_to_end(model_id)
+        stat = self._stat(model_id)
+        stat["hits"] += 1
+        stat["last_access"] = time.time()
+
+    def get(self, model_id: str = None) -> ModelBundle:
+        model_id = model_id or DEFAULT_MODEL_ID
+        model_path = self.path_for(model_id) / "best_model.pkl"
+        mtime_ns = os.stat(model_path).st_mtime_ns
+
+        with self._lock:
+            bundle = self._bundles.get(model_id)
+            if bundle is not None and bundle.mtime_ns == mtime_ns:
+                self._hit(model_id)
+                return bundle
+            model_lock = self._model_locks.setdefault(model_id, threading.Lock())
+
+        # Only one thread loads a given model; concurrent first requests for
+        # it wait here and then pick up the freshly registered bundle.
+        with model_lock:
+            with self._lock:
+                bundle = self._bundles.get(model_id)
+                if bundle is not None and bundle.mtime_ns == mtime_ns:
+                    self._hit(model_id)
+                    return bundle
+
+            start = time.perf_counter()
+            bundle = self._load(model_id, mtime_ns)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._bundles[model_id] = bundle
+                self._bundles.move_to_end(model_id)
+                stat = self._stat(model_id)
+                stat["loads"] += 1
+                stat["load_seconds"] += elapsed
+                stat["last_access"] = time.time()
+                self._evict(keep=model_id)
+            return bundle
+
+    def _load(self, model_id: str, mtime_ns: int) -> ModelBundle:
+        path = self.path_for(model_id)
+        model = joblib.load(path / "best_model.pkl")
+        preprocessor = joblib.load(path / "preprocessor.pkl")
+        with open(path / "feature_list.json") as f:
+            feature_list = json.load(f)
+        size_bytes = sum((path / name).stat().st_size for name in ARTIFACT_FILES)
+        return ModelBundle(model_id, model, preprocessor, feature_list, size_bytes, mtime_ns)
+
+    def _evict(self, keep: str):
+        # Pickle size on disk is used as the memory estimate for a bundle.
+        used = sum(b.size_bytes for b in self._bundles.values())
+        for model_id in list(self._bundles):
+            if used <= self.memory_budget:
+                break
+            if model_id == keep or model_id in self.pinned:
+                continue
+            used -= self._bundles.pop(model_id).size_bytes
+            self._stat(model_id)["evictions"] += 1
+
+    def pin(self, model_id: str):
+        self.get(model_id)
+        with self._lock:
+            self.pinned.add(model_id)
+
+    def unpin(self, model_id: str):
+        with self._lock:
+            self.pinned.discard(model_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {}
+            for model_id, stat in self._stats.items():
+                bundle = self._bundles.get(model_id)
+                models[model_id] = {
+                    "loaded": bundle is not None,
+                    "pinned": model_id in self.pinned,
+                    "size_mb": round(bundle.size_bytes / 1024 / 1024, 2) if bundle else None,
+                    **stat,
+                    "load_seconds": round(stat["load_seconds"], 3),
+                }
+            return {
+                "memory_budget_mb": round(self.memory_budget / 1024 / 1024, 1),
+                "memory_used_mb": round(sum(b.size_bytes for b in self._bundles.values()) / 1024 / 1024, 2),
+                "lru_order": list(self._bundles),
+                "models": models,
+            }
@@ -1,18 +1,45 @@
-import json
-import joblib
+import hashlib
 import numpy as np
 import pandas as pd
 from pathlib import Path
+
+from model_registry import ModelRegistry
+
 MODELS_DIR = Path("models")
-def load_artifacts():
+REGISTRY = ModelRegistry(MODELS_DIR)
+
+
+def load_artifacts(model_id: str = None):
+    
+    return REGISTRY.get(model_id).artifacts()
+
+
+_VERSION_CACHE = {}
+
+
+def content_version(*paths: Path) -> str:
+    
+    # Content hash of artifact files, recomputed only when one of them changes.
+    stats = [p.stat() for p in paths]
+    key = tuple((str(p), st.st_mtime_ns, st.st_size) for p, st in zip(paths, stats))
+    if key not in _VERSION_CACHE:
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _VERSION_CACHE[key] = digest.hexdigest()[:12]
+    return _VERSION_CACHE[key]
+
+
+def get_model_version(model_id: str = None) -> str:
     
-    model = joblib.load(MODELS_DIR / "best_model.pkl")
-    preprocessor = joblib.load(MODELS_DIR / "preprocessor.pkl")
+    return content_version(REGISTRY.path_for(model_id) / "best_model.pkl")
 
-    with open(MODELS_DIR / "feature_list.json") as f:
-        feature_list = json.load(f)
 
-    return model, preprocessor, feature_list
+def get_preprocessing_version(model_id: str = None) -> str:
+    
+    path = REGISTRY.path_for(model_id)
+    return content_version(path / "preprocessor.pkl", path / "feature_list.json")
 
 
 def get_risk_label(probability: float) -> str:
@@ -50,37 +77,56 @@ def get_risk_actions(risk_label: str) -> list:
     return actions.get(risk_label, [])
 
 
-def predict_attrition(employee_data: dict) -> dict:
+def prepare_features(df_input: pd.DataFrame, feature_list: list) -> pd.DataFrame:
     
-    model, preprocessor, feature_list = load_artifacts()
+    from feature_engineering import compile_features, engineered_features_in
+    plan = compile_features(engineered_features_in(feature_list))
+    values = dict(zip(plan.features, plan.evaluate(plan.input_array(df_input), per_row=True)))
+
+    columns = {}
+    for col in feature_list:
+        if col in values:
+            columns[col] = values[col]
+        elif col in df_input.columns:
+            columns[col] = df_input[col].to_numpy()
+        else:
+            columns[col] = np.zeros(len(df_input))
 
-    df_input = pd.DataFrame([employee_data])
+    return pd.DataFrame(columns, index=df_input.index)
 
-    from feature_engineering import engineer_features
-    df_input = engineer_features(df_input)
 
+def score_frame(df_input: pd.DataFrame, model, preprocessor, feature_list: list) -> list:
     
-    for col in feature_list:
-        if col not in df_input.columns:
-            df_input[col] = 0 
+    X = preprocessor.transform(prepare_features(df_input, feature_list))
+    return score_vectors(X, model)
+
 
-    df_input = df_input[feature_list]
+def score_vectors(X: np.ndarray, model) -> list:
+    
+    probabilities = model.predict_proba(X)[:, 1]
+    predictions = model.predict(X)
+
+    results = []
+    for probability, prediction in zip(probabilities.tolist(), predictions.tolist()):
+        risk_label = get_risk_label(probability)
+        results.append({
+            "will_attrite": bool(prediction),
+            "attrition_probability": round(probability, 4),
+            "risk_level": risk_label,
+            "recommended_actions": get_risk_actions(risk_label)
+        })
+    return results
+
+
+def predict_batch(records: list, model_id: str = None) -> list:
+    
+    model, preprocessor, feature_list = load_artifacts(model_id)
+    return score_frame(pd.DataFrame(records), model, preprocessor, feature_list)
 
- 
-    X = preprocessor.transform(df_input)
 
-   
-    probability = float(model.predict_proba(X)[0][1])
-    prediction = int(model.predict(X)[0])
-    risk_label = get_risk_label(probability)
-    actions = get_risk_actions(risk_label)
-
-    return {
-        "will_attrite": bool(prediction),
-        "attrition_probability": round(probability, 4),
-        "risk_level": risk_label,
-        "recommended_actions": actions
-    }
+def predict_attrition(employee_data: dict, model_id: str = None) -> dict:
+    
+    return predict_batch([employee_data], model_id)[0]
 
 
 if __name__ == "__main__":
@@ -90,6 +90,11 @@ def preprocess_data(df: pd.DataFrame, target: str = "Attrition"):
     feature_names = X_train.columns.tolist()
     save_preprocessor_artifacts(preprocessor, feature_names)
 
+    from drift import build_reference, save_reference
+    from feature_engineering import FEATURE_REGISTRY
+    input_fields = [c for c in feature_names if c not in FEATURE_REGISTRY]
+    save_reference(build_reference(X_train, input_fields))
+
     print("="*50 + "\n")
 
     return X_train_transformed, X_test_transformed, y_train, y_test, preprocessor
@@ -100,6 +105,6 @@ if __name__ == "__main__":
     from feature_engineering import engineer_features
 
     df = clean_data("data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
-    df = engineer_features(df)
+    df = engineer_features(df, verbose=True)
     X_train, X_test, y_train, y_test, preprocessor = preprocess_data(df)
     print(f"Final training shape: {X_train.shape}")
\ No newline at end of file
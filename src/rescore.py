@@ -0,0 +1,204 @@
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+DATA_PATH = "data/WA_Fn-UseC_-HR-Employee-Attrition.csv"
+SCORES_DB_PATH = Path("data/scores.db")
+ID_COLUMN = "EmployeeNumber"
+CHUNK_ROWS = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    employee_id TEXT PRIMARY KEY,
+    row_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    preprocessing_version TEXT,
+    attrition_probability REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    will_attrite INTEGER NOT NULL,
+    scored_at REAL NOT NULL
+);
+"""
+
+
+def connect(path: Path = SCORES_DB_PATH) -> sqlite3.Connection:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Databases created before scores were keyed on the preprocessing
+    # version get the column added; their rows are invalidated once.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(scores)")}
+    if "preprocessing_version" not in columns:
+        conn.execute("ALTER TABLE scores ADD COLUMN preprocessing_version TEXT")
+    return conn
+
+
+def input_fields(feature_list: list, df: pd.DataFrame) -> list:
+
+    from feature_engineering import FEATURE_REGISTRY
+    return [c for c in feature_list if c not in FEATURE_REGISTRY and c in df.columns]
+
+
+def row_hashes(df: pd.DataFrame, fields: list) -> np.ndarray:
+
+    # Vectorised 64-bit content hash of each employee's model inputs; the
+    # column order is fixed by feature_list so the hash is stable across runs.
+    hashes = pd.util.hash_pandas_object(df[fields], index=False).to_numpy()
+    return np.array([f"{h:016x}" for h in hashes.tolist()])
+
+
+def plan_rescore(df: pd.DataFrame, hashes: np.ndarray, model_version: str, existing: pd.DataFrame,
+                 preprocessing_version: str = None) -> dict:
+
+    ids = df[ID_COLUMN].astype(str).to_numpy()
+    known = existing.set_index("employee_id")
+
+    prev_hash = known["row_hash"].reindex(ids).to_numpy()
+    prev_version = known["model_version"].reindex(ids).to_numpy()
+    prev_preprocessing = known["preprocessing_version"].reindex(ids).to_numpy()
+
+    # A stored score is current only if both the model and the preprocessing
+    # artifacts (preprocessor.pkl + feature_list.json) are unchanged.
+    is_new = pd.isna(prev_hash)
+    is_changed = ~is_new & (prev_hash != hashes)
+    is_invalidated = ~is_new & ~is_changed & (
+        (prev_version != model_version) | (prev_preprocessing != preprocessing_version)
+    )
+
+    return {
+        "new": is_new,
+        "changed": is_changed,
+        "model_invalidated": is_invalidated,
+        "removed": sorted(set(known.index) - set(ids)),
+    }
+
+
+def feed_risk_store(risk_store, df: pd.DataFrame, probabilities, risk_levels, model_version: str) -> int:
+
+    fields = [f for f in risk_store.group_fields if f in df.columns]
+    risk_store.upsert_many(
+        zip(df[ID_COLUMN], df[fields].to_dict("records"), probabilities, risk_levels,
+            [model_version] * len(df)),
+        keep_missing=True,
+    )
+    return len(df)
+
+
+def rescore(filepath: str, db_path: Path = SCORES_DB_PATH, chunk_rows: int = CHUNK_ROWS,
+            force: bool = False, risk_store=None) -> dict:
+
+    from data_cleaning import clean_data
+    from predict import load_artifacts, get_model_version, get_preprocessing_version, score_frame
+
+    print("\n" + "="*50)
+    print("INCREMENTAL RE-SCORING")
+    print("="*50)
+    start = time.perf_counter()
+
+    df = clean_data(filepath, keep_ids=True)
+    if ID_COLUMN not in df.columns:
+        raise KeyError(f"'{ID_COLUMN}' column is required for incremental re-scoring")
+    df = df.drop_duplicates(subset=ID_COLUMN, keep="last").reset_index(drop=True)
+
+    model, preprocessor, feature_list = load_artifacts()
+    model_version = get_model_version()
+    preprocessing_version = get_preprocessing_version()
+    hashes = row_hashes(df, input_fields(feature_list, df))
+
+    conn = connect(db_path)
+    existing = pd.read_sql(
+        "SELECT employee_id, row_hash, model_version, preprocessing_version, attrition_probability, "
+        "risk_level FROM scores", conn
+    )
+    plan = plan_rescore(df, hashes, model_version, existing, preprocessing_version)
+
+    stale = plan["new"] | plan["changed"] | plan["model_invalidated"]
+    if force:
+        stale[:] = True
+    stale_idx = np.flatnonzero(stale)
+    fed = 0
+
+    for begin in range(0, len(stale_idx), chunk_rows):
+        idx = stale_idx[begin:begin + chunk_rows]
+        chunk = df.iloc[idx]
+        results = score_frame(chunk, model, preprocessor, feature_list)
+        now = time.time()
+        rows = [
+            (str(emp_id), row_hash, model_version, preprocessing_version, r["attrition_probability"],
+             r["risk_level"], int(r["will_attrite"]), now)
+            for emp_id, row_hash, r in zip(chunk[ID_COLUMN], hashes[idx], results)
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO scores (employee_id, row_hash, model_version, preprocessing_version, "
+                "attrition_probability, risk_level, will_attrite, scored_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(employee_id) DO UPDATE SET "
+                "row_hash = excluded.row_hash, model_version = excluded.model_version, "
+                "preprocessing_version = excluded.preprocessing_version, "
+                "attrition_probability = excluded.attrition_probability, "
+                "risk_level = excluded.risk_level, will_attrite = excluded.will_attrite, "
+                "scored_at = excluded.scored_at",
+                rows,
+            )
+        if risk_store is not None:
+            fed += feed_risk_store(risk_store, chunk, [r["attrition_probability"] for r in results],
+                                   [r["risk_level"] for r in results], model_version)
+
+    if plan["removed"]:
+        with conn:
+            conn.executemany("DELETE FROM scores WHERE employee_id = ?", [(e,) for e in plan["removed"]])
+    conn.close()
+
+    if risk_store is not None:
+        # Unchanged employees are fed from their stored scores, but only
+        # when the risk store is missing them or holds another model's score.
+        ids = df[ID_COLUMN].astype(str).to_numpy()
+        missing = ~stale & ~np.array(risk_store.current_mask(ids, model_version), dtype=bool)
+        if missing.any():
+            known = existing.set_index("employee_id").reindex(ids[missing])
+            fed += feed_risk_store(risk_store, df[missing], known["attrition_probability"].tolist(),
+                                   known["risk_level"].tolist(), model_version)
+        for employee_id in plan["removed"]:
+            risk_store.remove(employee_id)
+
+    summary = {
+        "employees": len(df),
+        "new": int(plan["new"].sum()),
+        "changed": int(plan["changed"].sum()),
+        "model_invalidated": int(plan["model_invalidated"].sum()),
+        "rescored": len(stale_idx),
+        "unchanged": len(df) - len(stale_idx),
+        "removed": len(plan["removed"]),
+        "risk_store_updated": fed if risk_store is not None else None,
+        "model_version": model_version,
+        "preprocessing_version": preprocessing_version,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    for k, v in summary.items():
+        print(f"   {k:<18}: {v}")
+    print("="*50 + "\n")
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Re-score only new / changed employees")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--db", type=Path, default=SCORES_DB_PATH)
+    parser.add_argument("--force", action="store_true", help="Re-score every employee")
+    parser.add_argument("--risk-store", action="store_true",
+                        help="Also bulk-update the org risk store snapshot (use POST /org-risk/rescore "
+                             "instead while the API is running)")
+    args = parser.parse_args()
+
+    store = None
+    if args.risk_store:
+        from risk_store import RiskStore, STORE_PATH
+        store = RiskStore.load(STORE_PATH) if STORE_PATH.exists() else RiskStore()
+    rescore(args.data, args.db, force=args.force, risk_store=store)
+    if store is not None:
+        store.save(STORE_PATH)
@@ -0,0 +1,284 @@
+import bisect
+import os
+from collections import Counter
+import pickle
+import threading
+from pathlib import Path
+
+MODELS_DIR = Path("models")
+STORE_PATH = MODELS_DIR / "risk_store.pkl"
+SNAPSHOT_INTERVAL = float(os.environ.get("ATTRITION_RISK_SNAPSHOT_SECONDS", 60.0))
+RANKING_LOAD = 512
+
+GROUP_FIELDS = ["Department", "JobRole", "ManagerId"]
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+
+class SortedRanking:
+
+    # Sorted sequence stored as a list of sorted chunks of at most
+    # 2 * RANKING_LOAD keys: finding the chunk is a bisect over the chunk
+    # maxima and the insert / delete only shifts one small chunk, so updates
+    # stay cheap for groups of hundreds of thousands of employees.
+
+    __slots__ = ("_chunks", "_maxes")
+
+    def __init__(self, keys: list = ()):
+        keys = sorted(keys)
+        self._chunks = [keys[i:i + RANKING_LOAD] for i in range(0, len(keys), RANKING_LOAD)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks)
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        pos = min(bisect.bisect_left(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[pos]
+        bisect.insort(chunk, key)
+        self._maxes[pos] = chunk[-1]
+        if len(chunk) > 2 * RANKING_LOAD:
+            self._chunks[pos:pos + 1] = [chunk[:RANKING_LOAD], chunk[RANKING_LOAD:]]
+            self._maxes[pos:pos + 1] = [chunk[RANKING_LOAD - 1], chunk[-1]]
+
+    def discard(self, key):
+        pos = bisect.bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            return
+        chunk = self._chunks[pos]
+        idx = bisect.bisect_left(chunk, key)
+        if idx < len(chunk) and chunk[idx] == key:
+            del chunk[idx]
+            if chunk:
+                self._maxes[pos] = chunk[-1]
+            else:
+                del self._chunks[pos]
+                del self._maxes[pos]
+
+    def head(self, k: int) -> list:
+        result = []
+        for chunk in self._chunks:
+            if len(result) >= k:
+                break
+            result.extend(chunk[:k - len(result)])
+        return result
+
+
+class GroupAggregate:
+
+    __slots__ = ("count", "probability_sum", "histogram", "ranking")
+
+    def __init__(self):
+        self.count = 0
+        self.probability_sum = 0.0
+        self.histogram = {level: 0 for level in RISK_LEVELS}
+        # Kept sorted by (-probability, employee_id) so the highest-risk
+        # employees of the group are always at the front.
+        self.ranking = SortedRanking()
+
+    def add(self, employee_id: str, probability: float, risk_level: str):
+        self.count += 1
+        self.probability_sum += probability
+        self.histogram[risk_level] += 1
+        self.ranking.add((-probability, employee_id))
+
+    def remove(self, employee_id: str, probability: float, risk_level: str):
+        self.count -= 1
+        self.probability_sum -= probability
+        self.histogram[risk_level] -= 1
+        self.ranking.discard((-probability, employee_id))
+
+    def summary(self) -> dict:
+        mean = self.probability_sum / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_probability": round(mean, 4),
+            "risk_histogram": dict(self.histogram),
+        }
+
+    def top(self, k: int) -> list:
+        return [
+            {"employee_id": employee_id, "attrition_probability": round(-neg_prob, 4)}
+            for neg_prob, employee_id in self.ranking.head(k)
+        ]
+
+
+class RiskStore:
+
+    def __init__(self, group_fields: list = None):
+        self.group_fields = list(group_fields or GROUP_FIELDS)
+        self._lock = threading.Lock()
+        # employee_id -> (probability, risk_level, {group_field: group_value}, model_version)
+        self._employees = {}
+        self._groups = {field: {} for field in self.group_fields}
+        self._model_versions = Counter()
+        self._version = 0
+        self._saved_version = 0
+        self._save_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._employees)
+
+    def upsert(self, employee_id, record: dict, probability: float, risk_level: str,
+               model_version: str = None):
+        self.upsert_many([(employee_id, record, probability, risk_level, model_version)])
+
+    def upsert_many(self, rows, keep_missing: bool = False):
+        # Bulk path for batch jobs: one lock acquisition per batch of
+        # (employee_id, record, probability, risk_level, model_version) rows.
+        # With keep_missing, group fields absent from a record (e.g. ManagerId,
+        # which the HR extract does not carry) keep their current membership.
+        with self._lock:
+            for employee_id, record, probability, risk_level, model_version in rows:
+                employee_id = str(employee_id)
+                memberships = {
+                    field: str(record[field])
+                    for field in self.group_fields
+                    if record.get(field) is not None
+                }
+                if keep_missing and employee_id in self._employees:
+                    memberships = {**self._employees[employee_id][2], **memberships}
+
+                self._detach(employee_id)
+                for field, value in memberships.items():
+                    groups = self._groups[field]
+                    if value not in groups:
+                        groups[value] = GroupAggregate()
+                    groups[value].add(employee_id, probability, risk_level)
+                self._employees[employee_id] = (probability, risk_level, memberships, model_version)
+                self._model_versions[model_version] += 1
+                self._version += 1
+
+    def remove(self, employee_id) -> bool:
+        with self._lock:
+            removed = self._detach(str(employee_id))
+            self._version += removed
+            return removed
+
+    def _detach(self, employee_id: str) -> bool:
+        previous = self._employees.pop(employee_id, None)
+        if previous is None:
+            return False
+
+        probability, risk_level, memberships, model_version = previous
+        for field, value in memberships.items():
+            group = self._groups[field][value]
+            group.remove(employee_id, probability, risk_level)
+            if group.count == 0:
+                del self._groups[field][value]
+        self._model_versions[model_version] -= 1
+        if not self._model_versions[model_version]:
+            del self._model_versions[model_version]
+        return True
+
+    def current_mask(self, employee_ids, model_version: str) -> list:
+        # True for employees already stored with scores from model_version.
+        with self._lock:
+            mask = []
+            for employee_id in employee_ids:
+                entry = self._employees.get(str(employee_id))
+                mask.append(entry is not None and entry[3] == model_version)
+            return mask
+
+    def model_versions(self, current: str = None) -> dict:
+        with self._lock:
+            versions = {str(v): n for v, n in self._model_versions.items()}
+            stale = sum(n for v, n in self._model_versions.items() if v != current)
+        return {
+            "current": current,
+            "employees_by_model_version": versions,
+            "stale_employees": stale if current is not None else None,
+        }
+
+    def group_summaries(self, field: str) -> dict:
+        with self._lock:
+            return {value: group.summary() for value, group in self._groups[field].items()}
+
+    def group_summary(self, field: str, value: str, k: int = 10):
+        with self._lock:
+            group = self._groups[field].get(value)
+            if group is None:
+                return None
+            return {
+                "group_by": field,
+                "group": value,
+                **group.summary(),
+                "top_at_risk": group.top(k),
+            }
+
+    def save(self, path: Path = STORE_PATH) -> bool:
+        # Only a shallow copy is taken under the lock; the entries are
+        # immutable once stored, so pickling runs without blocking updates.
+        # The snapshot is written to a temporary file and swapped in, so a
+        # crash mid-save never leaves a truncated store behind.
+        with self._save_lock:
+            with self._lock:
+                if self._version == self._saved_version:
+                    return False
+                version = self._version
+                employees = dict(self._employees)
+
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump((self.group_fields, employees), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._saved_version = version
+            return True
+
+    def start_snapshots(self, path: Path = STORE_PATH, interval: float = SNAPSHOT_INTERVAL):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._snapshot_loop, args=(path, interval),
+                                            name="risk-store-snapshot", daemon=True)
+            self._thread.start()
+
+    def _snapshot_loop(self, path: Path, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.save(path)
+            except OSError as e:
+                print(f"Risk store snapshot failed: {e}")
+
+    def close(self, path: Path = STORE_PATH):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.save(path)
+
+    @classmethod
+    def load(cls, path: Path = STORE_PATH) -> "RiskStore":
+        # Aggregates and rankings are rebuilt in bulk: one pass to collect
+        # each group's keys, then a single sort per group.
+        with open(path, "rb") as f:
+            group_fields, employees = pickle.load(f)
+        store = cls(group_fields)
+        keys = {field: {} for field in group_fields}
+        for employee_id, entry in employees.items():
+            if len(entry) == 3:
+                # Snapshots written before entries carried a model version.
+                entry = employees[employee_id] = (*entry, None)
+            probability, risk_level, memberships, model_version = entry
+            store._model_versions[model_version] += 1
+            for field, value in memberships.items():
+                group = store._groups[field].get(value)
+                if group is None:
+                    group = store._groups[field][value] = GroupAggregate()
+                    keys[field][value] = []
+                group.count += 1
+                group.probability_sum += probability
+                group.histogram[risk_level] += 1
+                keys[field][value].append((-probability, employee_id))
+
+        for field, groups in keys.items():
+            for value, group_keys in groups.items():
+                store._groups[field][value].ranking = SortedRanking(group_keys)
+        store._employees = employees
+        return store
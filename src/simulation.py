@@ -0,0 +1,196 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+DATA_PATH = "data/WA_Fn-UseC_-HR-Employee-Attrition.csv"
+BREAKDOWN_FIELDS = ["Department", "JobRole"]
+CHUNK_ROWS = 5_000
+OPERATIONS = {
+    "set": lambda column, value: np.full(len(column), value),
+    "add": lambda column, value: column.to_numpy() + value,
+    "multiply": lambda column, value: column.to_numpy() * value,
+}
+
+_WORKER = {}
+_POPULATION = {}
+
+
+def load_population(filepath: str = DATA_PATH) -> pd.DataFrame:
+
+    # The cleaned population is cached per process until the file changes.
+    from data_cleaning import clean_data
+    key = (filepath, os.stat(filepath).st_mtime_ns)
+    if key not in _POPULATION:
+        _POPULATION.clear()
+        _POPULATION[key] = clean_data(filepath).reset_index(drop=True)
+    return _POPULATION[key]
+
+
+def scenario_mask(df: pd.DataFrame, filters: dict) -> np.ndarray:
+
+    mask = np.ones(len(df), dtype=bool)
+    for field, allowed in (filters or {}).items():
+        if field not in df.columns:
+            raise ValueError(f"Unknown filter field '{field}'")
+        allowed = allowed if isinstance(allowed, list) else [allowed]
+        mask &= df[field].isin(allowed).to_numpy()
+    return mask
+
+
+def check_transform(column: pd.Series, field: str, op: str, value):
+
+    numeric_column = pd.api.types.is_numeric_dtype(column)
+    numeric_value = isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+    if op in ("add", "multiply") and not numeric_column:
+        raise ValueError(f"Transform '{op}' needs a numeric field; '{field}' is categorical")
+    if numeric_column and not numeric_value:
+        raise ValueError(f"Transform '{op}' on numeric field '{field}' needs a numeric value, got {value!r}")
+    if not numeric_column and not isinstance(value, str):
+        raise ValueError(f"Transform '{op}' on categorical field '{field}' needs a string value, got {value!r}")
+
+
+def apply_scenario(df: pd.DataFrame, scenario: dict) -> tuple:
+
+    # Returns the positions of the affected employees and their rows with
+    # every transform applied column-wise.
+    idx = np.flatnonzero(scenario_mask(df, scenario.get("filter")))
+    rows = df.iloc[idx].copy()
+    for transform in scenario.get("transforms", []):
+        field, op, value = transform["field"], transform["op"], transform["value"]
+        if field not in rows.columns:
+            raise ValueError(f"Unknown transform field '{field}'")
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown transform op '{op}'. Use one of {list(OPERATIONS)}.")
+        check_transform(df[field], field, op, value)
+        rows[field] = OPERATIONS[op](rows[field], value)
+    return idx, rows
+
+
+def _init_worker(artifacts: tuple):
+    _WORKER["artifacts"] = artifacts
+
+
+def _score_chunk(df: pd.DataFrame, artifacts: tuple = None) -> np.ndarray:
+    from predict import prepare_features
+    model, preprocessor, feature_list = artifacts or _WORKER["artifacts"]
+    return model.predict_proba(preprocessor.transform(prepare_features(df, feature_list)))[:, 1]
+
+
+def score_population(df: pd.DataFrame, model_id: str = None, n_workers: int = 1,
+                     chunk_rows: int = CHUNK_ROWS) -> np.ndarray:
+
+    # Artifacts always come from the in-process model registry. Worker
+    # processes (CLI only, see simulate) receive that loaded bundle once via
+    # the pool initializer instead of reloading the pickles themselves.
+    from predict import load_artifacts
+    artifacts = load_artifacts(model_id)
+    if len(df) == 0:
+        return np.empty(0)
+    chunks = [df.iloc[begin:begin + chunk_rows] for begin in range(0, len(df), chunk_rows)]
+    n_workers = min(n_workers, len(chunks))
+
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(artifacts,)) as pool:
+            return np.concatenate(list(pool.map(_score_chunk, chunks)))
+    return np.concatenate([_score_chunk(chunk, artifacts) for chunk in chunks])
+
+
+def group_sums(codes: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+
+def compare(before: np.ndarray, after: np.ndarray, labels) -> dict:
+
+    return {
+        str(label): {
+            "before": round(float(b), 2),
+            "after": round(float(a), 2),
+            "delta": round(float(a - b), 2),
+        }
+        for label, b, a in zip(labels, before, after)
+    }
+
+
+def simulate(scenarios: list, filepath: str = DATA_PATH, model_id: str = None,
+             n_workers: int = None, chunk_rows: int = CHUNK_ROWS) -> dict:
+
+    # n_workers=None sizes a process pool from the CPU budget (CLI use);
+    # long-running threaded servers should pass n_workers=1 so nothing forks.
+    from cpu_budget import CpuBudget
+    from predict import get_model_version
+
+    start = time.perf_counter()
+    df = load_population(filepath)
+
+    # Every scenario's affected rows are stacked into one batch, so the
+    # population is scored once for the baseline and once for all scenarios.
+    affected, batches = [], []
+    for scenario in scenarios:
+        idx, rows = apply_scenario(df, scenario)
+        affected.append(idx)
+        batches.append(rows)
+    stacked = pd.concat([df.iloc[:0], *batches], ignore_index=True)
+
+    if n_workers is None:
+        n_chunks = -(-(len(df) + len(stacked)) // chunk_rows)
+        n_workers, _ = CpuBudget().allocate(tasks=n_chunks)
+
+    probabilities = score_population(pd.concat([df, stacked], ignore_index=True), model_id,
+                                     n_workers, chunk_rows)
+    baseline, scenario_probabilities = probabilities[:len(df)], probabilities[len(df):]
+
+    breakdowns = {}
+    for field in BREAKDOWN_FIELDS:
+        codes, labels = pd.factorize(df[field], sort=True)
+        breakdowns[field] = (codes, labels, group_sums(codes, len(labels), baseline))
+
+    total = float(baseline.sum())
+    results = []
+    offset = 0
+    for scenario, idx in zip(scenarios, affected):
+        delta = scenario_probabilities[offset:offset + len(idx)] - baseline[idx]
+        offset += len(idx)
+        result = {
+            "name": scenario.get("name", f"scenario_{len(results) + 1}"),
+            "affected_employees": len(idx),
+            "expected_leavers": compare([total], [total + delta.sum()], ["total"])["total"],
+        }
+        for field, (codes, labels, before) in breakdowns.items():
+            after = before + group_sums(codes[idx], len(labels), delta)
+            result[f"by_{field}"] = compare(before, after, labels)
+        results.append(result)
+
+    return {
+        "population": len(df),
+        "model_version": get_model_version(model_id),
+        "baseline_expected_leavers": round(total, 2),
+        "scenarios": results,
+        "rows_scored": len(probabilities),
+        "workers": n_workers,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Simulate the effect of HR policies on expected attrition")
+    parser.add_argument("scenarios", help="JSON file with a list of scenarios")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--model-id", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.scenarios) as f:
+        scenarios = json.load(f)
+    report = simulate(scenarios, args.data, args.model_id, args.workers)
+
+    print(f"\nBaseline expected leavers: {report['baseline_expected_leavers']} of {report['population']}")
+    for result in report["scenarios"]:
+        leavers = result["expected_leavers"]
+        print(f"   {result['name']:<32} {result['affected_employees']:>6} affected | "
+              f"{leavers['before']:.1f} → {leavers['after']:.1f} ({leavers['delta']:+.1f})")
@@ -17,11 +17,6 @@ from sklearn.ensemble import (
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (
-    roc_auc_score,
-    f1_score,
-    precision_score,
-    recall_score,
-    accuracy_score,
     confusion_matrix,
     ConfusionMatrixDisplay,
     roc_curve,
@@ -31,10 +26,15 @@ from sklearn.model_selection import (
     cross_val_score,
     StratifiedKFold,
     GridSearchCV,
+    ParameterGrid,
 )
 
+from sklearn.base import clone
 from xgboost import XGBClassifier
 
+from cpu_budget import CpuBudget
+from evaluation import EvaluationEngine
+
 warnings.filterwarnings("ignore")
 
 MODELS_DIR = Path("models")
@@ -43,20 +43,14 @@ MODELS_DIR.mkdir(exist_ok=True)
 PLOT_DIR = Path("notebooks/eda_plots")
 PLOT_DIR.mkdir(parents=True, exist_ok=True)
 
+METADATA_PATH = MODELS_DIR / "model_metadata.json"
+
 CV_FOLDS = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+CPU_BUDGET = CpuBudget()
+GRID_THREADS_PER_FIT = 4
 
-def evaluate_model(model, X_test, y_test, name=""):
-    y_pred = model.predict(X_test)
-    y_prob = model.predict_proba(X_test)[:, 1]
-
-    return {
-        "Model": name,
-        "ROC-AUC": roc_auc_score(y_test, y_prob),
-        "F1-Score": f1_score(y_test, y_pred),
-        "Precision": precision_score(y_test, y_pred),
-        "Recall": recall_score(y_test, y_pred),
-        "Accuracy": accuracy_score(y_test, y_pred),
-    }
+def evaluate_model(model, engine, name=""):
+    return engine.score(model, name)
 
 
 def print_metrics(m):
@@ -68,14 +62,18 @@ def print_metrics(m):
         f"R={m['Recall']:.4f}"
     )
 
-def train_base_learners(X_train, X_test, y_train, y_test):
+def train_base_learners(X_train, y_train, engine):
+
+    # Models are fitted one after another, so each one gets the whole budget
+    # for its own tree-level parallelism.
+    _, threads = CPU_BUDGET.allocate(tasks=1)
 
     base_models = {
         "Bagging": BaggingClassifier(
             estimator=DecisionTreeClassifier(max_depth=6),
             n_estimators=100,
             random_state=42,
-            n_jobs=-1,
+            n_jobs=threads,
         ),
 
         "Random Forest": RandomForestClassifier(
@@ -83,7 +81,7 @@ def train_base_learners(X_train, X_test, y_train, y_test):
             max_depth=10,
             class_weight="balanced",
             random_state=42,
-            n_jobs=-1,
+            n_jobs=threads,
         ),
 
         "Gradient Boosting": GradientBoostingClassifier(
@@ -103,13 +101,14 @@ def train_base_learners(X_train, X_test, y_train, y_test):
 
     trained = {}
     for name, model in base_models.items():
-        model.fit(X_train, y_train)
+        with CPU_BUDGET.stage(name, 1, threads):
+            model.fit(X_train, y_train)
         trained[name] = model
-        print_metrics(evaluate_model(model, X_test, y_test, name))
+        print_metrics(evaluate_model(model, engine, name))
 
     return trained
 
-def tune_xgboost_gridsearch(X_train, y_train, X_test, y_test):
+def tune_xgboost_gridsearch(X_train, y_train, engine):
 
     print("\nTUNING XGBOOST USING GRIDSEARCHCV")
 
@@ -130,70 +129,109 @@ def tune_xgboost_gridsearch(X_train, y_train, X_test, y_test):
         "scale_pos_weight": [1, 3, 5],
     }
 
+    n_fits = len(ParameterGrid(param_grid)) * CV_FOLDS.get_n_splits()
+    workers, threads = CPU_BUDGET.allocate(tasks=n_fits, inner=GRID_THREADS_PER_FIT)
+    xgb.set_params(n_jobs=threads)
+
     grid = GridSearchCV(
         estimator=xgb,
         param_grid=param_grid,
         scoring="roc_auc",
         cv=CV_FOLDS,
-        n_jobs=-1,
+        n_jobs=workers,
         verbose=1,
     )
 
-    grid.fit(X_train, y_train)
+    with CPU_BUDGET.stage("XGBoost GridSearch", workers, threads, processes=True):
+        grid.fit(X_train, y_train)
 
     best_xgb = grid.best_estimator_
 
     print("Best Params:", grid.best_params_)
-    print_metrics(evaluate_model(best_xgb, X_test, y_test, "XGBoost (GridSearch)"))
+    print_metrics(evaluate_model(best_xgb, engine, "XGBoost (GridSearch)"))
 
     return best_xgb
 
-def build_ensembles(xgb, X_train, y_train, X_test, y_test):
+def build_ensembles(xgb, X_train, y_train, engine):
+
+    # Voting fits its 3 members concurrently; each member gets an equal share.
+    workers, threads = CPU_BUDGET.allocate(tasks=3)
 
     voting = VotingClassifier(
         estimators=[
-            ("xgb", xgb),
-            ("rf", RandomForestClassifier(n_estimators=200, random_state=42)),
-            ("gb", GradientBoostingClassifier(n_estimators=200)),
+            ("xgb", clone(xgb).set_params(n_jobs=threads)),
+            ("rf", RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=threads)),
+            ("gb", GradientBoostingClassifier(n_estimators=200, random_state=42)),
         ],
         voting="soft",
         weights=[2, 1, 1],
-        n_jobs=-1,
+        n_jobs=workers,
     )
 
-    voting.fit(X_train, y_train)
-    print_metrics(evaluate_model(voting, X_test, y_test, "Voting Ensemble"))
+    with CPU_BUDGET.stage("Voting Ensemble", workers, threads, processes=True):
+        voting.fit(X_train, y_train)
+    print_metrics(evaluate_model(voting, engine, "Voting Ensemble"))
+
+    # Stacking runs its 5 internal CV folds concurrently for each member.
+    workers, threads = CPU_BUDGET.allocate(tasks=5)
 
     stacking = StackingClassifier(
         estimators=[
-            ("xgb", xgb),
-            ("rf", RandomForestClassifier(n_estimators=150)),
-            ("gb", GradientBoostingClassifier(n_estimators=150)),
+            ("xgb", clone(xgb).set_params(n_jobs=threads)),
+            ("rf", RandomForestClassifier(n_estimators=150, random_state=42, n_jobs=threads)),
+            ("gb", GradientBoostingClassifier(n_estimators=150, random_state=42)),
         ],
         final_estimator=LogisticRegression(max_iter=1000),
         cv=5,
-        n_jobs=-1,
+        n_jobs=workers,
     )
 
-    stacking.fit(X_train, y_train)
-    print_metrics(evaluate_model(stacking, X_test, y_test, "Stacking Ensemble"))
+    with CPU_BUDGET.stage("Stacking Ensemble", workers, threads, processes=True):
+        stacking.fit(X_train, y_train)
+    print_metrics(evaluate_model(stacking, engine, "Stacking Ensemble"))
 
     return voting, stacking
 
-def save_best_model(models, X_test, y_test):
-
-    scores = {}
-    for name, model in models.items():
-        scores[name] = evaluate_model(model, X_test, y_test, name)
+def save_best_model(models, engine):
 
-    best_name = max(scores, key=lambda x: scores[x]["ROC-AUC"])
+    # Every model was already scored once while training; this only reuses
+    # the cached probabilities and bootstrap CIs.
+    best_name = engine.select_best(models)
     best_model = models[best_name]
 
+    print(f"\n{'Model':<25} | ROC-AUC [{engine.ci_level:.0%} CI]")
+    for name in models:
+        report = engine.report(name)
+        low, high = report["ci"]["ROC-AUC"]
+        marker = " ←" if name == best_name else ""
+        print(f"{name:<25} | {report['metrics']['ROC-AUC']:.4f} [{low:.4f}, {high:.4f}]{marker}")
+
     joblib.dump(best_model, MODELS_DIR / "best_model.pkl")
 
+    metadata = {
+        "best_model": best_name,
+        "serving_model": best_name,
+        "selection": f"highest {engine.ci_level:.0%} CI lower bound of ROC-AUC",
+        "metrics": engine.report(best_name)["metrics"],
+        "evaluation": {name: engine.report(name) for name in models},
+    }
+    with open(METADATA_PATH, "w") as f:
+        json.dump(metadata, f, indent=2)
+
     print(f"\n BEST MODEL: {best_name}")
     return best_model
 
+
+def update_model_metadata(updates: dict):
+
+    metadata = {}
+    if METADATA_PATH.exists():
+        with open(METADATA_PATH) as f:
+            metadata = json.load(f)
+    metadata.update(updates)
+    with open(METADATA_PATH, "w") as f:
+        json.dump(metadata, f, indent=2)
+
 if __name__ == "__main__":
 
     from data_cleaning import clean_data
@@ -201,15 +239,17 @@ if __name__ == "__main__":
     from preprocessing import preprocess_data
 
     df = clean_data("data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
-    df = engineer_features(df)
+    df = engineer_features(df, verbose=True)
 
     X_train, X_test, y_train, y_test, preprocessor = preprocess_data(df)
 
-    base_models = train_base_learners(X_train, X_test, y_train, y_test)
-    xgb_best = tune_xgboost_gridsearch(X_train, y_train, X_test, y_test)
+    engine = EvaluationEngine(X_test, y_test)
+
+    base_models = train_base_learners(X_train, y_train, engine)
+    xgb_best = tune_xgboost_gridsearch(X_train, y_train, engine)
 
     voting, stacking = build_ensembles(
-        xgb_best, X_train, y_train, X_test, y_test
+        xgb_best, X_train, y_train, engine
     )
 
     all_models = {
@@ -219,5 +259,42 @@ if __name__ == "__main__":
         "Stacking": stacking,
     }
 
-    best_model = save_best_model(all_models, X_test, y_test)
+    best_model = save_best_model(all_models, engine)
+
+    from importance import N_REPEATS, compute_feature_importance
+    from predict import content_version
+    model_version = content_version(MODELS_DIR / "best_model.pkl")
+    n_fields = len(preprocessor.transformers_[0][2]) + len(preprocessor.transformers_[1][2])
+    workers, threads = CPU_BUDGET.allocate(tasks=n_fields * N_REPEATS)
+    with CPU_BUDGET.stage("Permutation Importance", workers, threads):
+        importance = compute_feature_importance(
+            best_model, X_test, y_test, preprocessor, model_version,
+            baseline_probabilities=engine.probabilities(best_model),
+            n_workers=workers, threads=threads,
+        )
+
+    from distill import distill_best_model
+    n_numeric = len(preprocessor.transformers_[0][2])
+    report = distill_best_model(best_model, X_train, X_test, y_test, n_numeric)
+    updates = {"distillation": report}
+    if report["published"]:
+        updates["serving_model"] = f"{report['student']} (distilled)"
+    # Importance is computed for the selected (teacher) model; when a
+    # distilled student is published it describes the teacher, not the
+    # model being served, and the metadata says so explicitly.
+    serving_version = content_version(MODELS_DIR / "best_model.pkl")
+    updates["feature_importance"] = {
+        **importance,
+        "computed_for": "teacher" if report["published"] else "serving_model",
+        "teacher_version": model_version,
+        "serving_version": serving_version,
+    }
+    update_model_metadata(updates)
+
+    from drift import PROBABILITY_FIELD, PROBABILITY_EDGES, numeric_sketch, save_reference
+    serving_model = joblib.load(MODELS_DIR / "best_model.pkl")
+    # Held-out predictions: in-sample ones are overconfident for tree
+    # ensembles and would make healthy traffic look like drift.
+    holdout_probabilities = serving_model.predict_proba(X_test)[:, 1]
+    save_reference({PROBABILITY_FIELD: numeric_sketch(holdout_probabilities, PROBABILITY_EDGES)}, merge=True)
     print("\nTraining Complete ")
\ No newline at end of file
@@ -0,0 +1,140 @@
+import csv
+import json
+from typing import AsyncIterator, List, Optional
+
+import anyio
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.responses import StreamingResponse
+
+CHUNK_ROWS = 500
+YES_NO = {"Yes": 1, "No": 0}
+
+
+class UploadStreamingResponse(StreamingResponse):
+
+    # The body iterator consumes the request body while responding. The stock
+    # disconnect listener also calls receive() and would swallow the upload's
+    # body messages, so leave receiving to the iterator and just wait to be
+    # cancelled once the response has been sent.
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
+
+
+def check_upload_content_type(header: str):
+
+    # Called before the streaming response starts: once the 200 and its
+    # headers are out, a body that cannot be parsed can only be truncated.
+    content_type, options = parse_options_header(header or "")
+    if content_type == b"multipart/form-data" and not options.get(b"boundary"):
+        raise ValueError("multipart/form-data upload is missing its boundary parameter")
+
+
+async def iter_upload_bytes(request) -> AsyncIterator[bytes]:
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+
+    if content_type != b"multipart/form-data":
+        async for chunk in request.stream():
+            if chunk:
+                yield chunk
+        return
+
+    # Multipart upload: feed the raw body through python-multipart's push
+    # parser and forward only the bytes of the uploaded file part, so the
+    # file is never spooled to memory or disk.
+    pending = []
+    state = {"field": b"", "value": b"", "is_file": False, "done": False}
+
+    def on_part_begin():
+        state["is_file"] = False
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        if state["field"].lower() == b"content-disposition":
+            _, params = parse_options_header(state["value"])
+            state["is_file"] = b"filename" in params
+        state["field"], state["value"] = b"", b""
+
+    def on_part_data(data, start, end):
+        if state["is_file"] and not state["done"]:
+            pending.append(data[start:end])
+
+    def on_part_end():
+        if state["is_file"]:
+            state["done"] = True
+
+    parser = MultipartParser(options[b"boundary"], callbacks={
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if pending:
+            yield b"".join(pending)
+            pending.clear()
+    parser.finalize()
+    if pending:
+        yield b"".join(pending)
+
+
+async def iter_lines(byte_chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+
+    tail = b""
+    first = True
+    async for chunk in byte_chunks:
+        if first:
+            chunk = chunk.removeprefix(b"\xef\xbb\xbf")
+            first = False
+        *lines, tail = (tail + chunk).split(b"\n")
+        for line in lines:
+            line = line.rstrip(b"\r")
+            if line.strip():
+                yield line.decode("utf-8")
+    if tail.strip():
+        yield tail.rstrip(b"\r").decode("utf-8")
+
+
+def parse_csv_row(header: List[str], line: str) -> dict:
+
+    values = next(csv.reader([line]))
+    record = dict(zip(header, values))
+    if record.get("OverTime") in YES_NO:
+        record["OverTime"] = YES_NO[record["OverTime"]]
+    return record
+
+
+async def iter_record_chunks(byte_chunks: AsyncIterator[bytes], fmt: Optional[str] = None,
+                             chunk_rows: int = CHUNK_ROWS) -> AsyncIterator[list]:
+
+    header = None
+    chunk = []
+    async for line in iter_lines(byte_chunks):
+        if fmt is None:
+            fmt = "ndjson" if line.lstrip().startswith("{") else "csv"
+
+        if fmt == "csv" and header is None:
+            header = next(csv.reader([line]))
+            continue
+
+        try:
+            record = json.loads(line) if fmt == "ndjson" else parse_csv_row(header, line)
+        except ValueError as e:
+            record = e
+        chunk.append(record)
+
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk